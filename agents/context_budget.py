@@ -0,0 +1,180 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types as genai_types
+
+from utils.log import get_logger
+from config.settings import (
+    CONTEXT_CHARS_PER_TOKEN,
+    CONTEXT_SUMMARY_MAX_CHARS,
+    CONTEXT_SUMMARY_SNIPPET_CHARS,
+    PROFILE_STATE_KEYS,
+)
+
+Turn = List[genai_types.Content]
+
+log = get_logger(__name__)
+
+
+class ContextBudget:
+    """
+    before_model_callback that keeps each prompt within a token budget.
+
+    ADK rebuilds the prompt from every event in the session, so without a
+    budget prompt size (and with it cost and latency) grows with the length of
+    the chat. When the estimated size exceeds the budget:
+
+    1. Tool calls and tool results are trimmed from earlier turns, keeping the
+       text the user and the agent exchanged.
+    2. The oldest turns are folded into a bounded rolling summary until the
+       rest fits, newest turns being kept verbatim.
+    3. The summary is sent as the first message together with the user's
+       profile (user_name, user_hobbies, user_interests) from session state,
+       so those facts survive however much history is compacted.
+
+    The current turn is never modified. Token counts are estimated from
+    character length, as calling the tokenizer would cost a round trip per turn.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.compacted_requests = 0
+
+    def __call__(self, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        contents = llm_request.contents
+        fixed_tokens = _estimate_tokens(_system_instruction_text(llm_request))
+        tokens_before = fixed_tokens + sum(_estimate_content_tokens(c) for c in contents)
+        if tokens_before <= self.max_tokens:
+            return None
+
+        turns = _split_turns(contents)
+        if len(turns) < 2:
+            return None  # Only the current turn; nothing older to compact
+        older, current = [_without_tool_events(turn) for turn in turns[:-1]], turns[-1]
+        older = [turn for turn in older if turn]
+
+        profile = {key: callback_context.state.get(key) for key in PROFILE_STATE_KEYS}
+        turn_tokens = [sum(_estimate_content_tokens(c) for c in turn) for turn in older]
+        current_tokens = sum(_estimate_content_tokens(c) for c in current)
+        available = self.max_tokens - fixed_tokens - current_tokens - _estimate_tokens(_profile_text(profile))
+
+        # Fold the oldest turns into the summary until the remainder fits
+        summary_lines: List[str] = []
+        kept_tokens = sum(turn_tokens)
+        folded = 0
+        summary_chars = 0
+        summary_cap_tokens = _estimate_tokens_from_chars(CONTEXT_SUMMARY_MAX_CHARS)
+        while folded < len(older) and kept_tokens + min(_estimate_tokens_from_chars(summary_chars), summary_cap_tokens) > available:
+            summary_lines.append(_summarize_turn(older[folded]))
+            summary_chars += len(summary_lines[-1]) + 1
+            kept_tokens -= turn_tokens[folded]
+            folded += 1
+
+        llm_request.contents = [_context_content(profile, summary_lines)]
+        for turn in older[folded:] + [current]:
+            llm_request.contents.extend(turn)
+
+        self.compacted_requests += 1
+        tokens_after = fixed_tokens + sum(_estimate_content_tokens(c) for c in llm_request.contents)
+        log.info("context.compacted", "Prompt compacted from ~%d to ~%d tokens", tokens_before, tokens_after,
+                 budget_tokens=self.max_tokens, turns_summarized=folded, turns_kept=len(older) - folded)
+        return None
+
+
+def _split_turns(contents: List[genai_types.Content]) -> List[Turn]:
+    """Group contents into turns, each starting at a user text message."""
+    turns: List[Turn] = []
+    for content in contents:
+        if _is_user_message(content) or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _is_user_message(content: genai_types.Content) -> bool:
+    return content.role == "user" and any(part.text for part in content.parts or []) and not any(
+        part.function_response for part in content.parts or []
+    )
+
+
+def _without_tool_events(turn: Turn) -> Turn:
+    """Drop function call/response parts, keeping each content's text."""
+    trimmed = []
+    for content in turn:
+        text_parts = [part for part in content.parts or [] if part.text and not part.thought]
+        if text_parts:
+            trimmed.append(genai_types.Content(role=content.role, parts=text_parts))
+    return trimmed
+
+
+def _summarize_turn(turn: Turn) -> str:
+    lines = []
+    for content in turn:
+        text = " ".join(part.text.strip() for part in content.parts or [] if part.text)
+        if text:
+            speaker = "User" if content.role == "user" else "Assistant"
+            lines.append(f"{speaker}: {_truncate(text, CONTEXT_SUMMARY_SNIPPET_CHARS)}")
+    return " / ".join(lines)
+
+
+def _context_content(profile: Dict[str, Any], summary_lines: List[str]) -> genai_types.Content:
+    """The pinned first message: user profile plus the rolling summary of compacted turns."""
+    text = _profile_text(profile)
+    if summary_lines:
+        # Bound the summary itself, dropping its oldest lines first
+        omitted = 0
+        while len(summary_lines) > 1 and sum(len(line) + 1 for line in summary_lines) > CONTEXT_SUMMARY_MAX_CHARS:
+            summary_lines = summary_lines[1:]
+            omitted += 1
+        header = "Summary of the earlier conversation"
+        if omitted:
+            header += f" ({omitted} older turns omitted)"
+        text += f"\n{header}:\n" + "\n".join(f"- {line}" for line in summary_lines)
+    return genai_types.Content(role="user", parts=[genai_types.Part(text=text)])
+
+
+def _profile_text(profile: Dict[str, Any]) -> str:
+    known = ", ".join(f"{key}={value}" for key, value in profile.items() if value)
+    return f"[Context] Known user profile: {known or 'nothing yet'}."
+
+
+def _system_instruction_text(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is None:
+        return ""
+    if isinstance(instruction, str):
+        return instruction
+    return json.dumps(instruction, default=str)
+
+
+def _estimate_content_tokens(content: genai_types.Content) -> int:
+    chars = 0
+    for part in content.parts or []:
+        if part.text:
+            chars += len(part.text)
+        elif part.function_call is not None:
+            chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+        elif part.function_response is not None:
+            chars += len(part.function_response.name or "") + len(json.dumps(part.function_response.response or {}, default=str))
+    return _estimate_tokens_from_chars(chars)
+
+
+def _estimate_tokens(text: str) -> int:
+    return _estimate_tokens_from_chars(len(text))
+
+
+def _estimate_tokens_from_chars(chars: int) -> int:
+    return -(-chars // CONTEXT_CHARS_PER_TOKEN)  # Ceiling division
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def create_context_budget(max_tokens: Optional[int]) -> Optional[ContextBudget]:
+    """Return a ContextBudget callback, or None when budgeting is disabled (max_tokens falsy)."""
+    if not max_tokens:
+        return None
+    return ContextBudget(max_tokens)
@@ -0,0 +1,125 @@
+import asyncio
+import random
+import re
+import zlib
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+
+from config.settings import (
+    FAKE_MODEL_FIRST_TOKEN_LATENCY_SECONDS,
+    FAKE_MODEL_TOKENS_PER_SECOND,
+    FAKE_MODEL_EMIT_TOOL_CALLS,
+    FAKE_MODEL_FAILURE_RATE,
+    FAKE_MODEL_EMPTY_RATE,
+)
+
+# Deterministic replies for turns that do not trigger a tool call; one is
+# picked by a stable hash of the user text so repeated runs are identical
+SCRIPTED_REPLIES = [
+    "That's a great question! As a local test model I can only give scripted answers, but I'm happy to keep chatting.",
+    "Thanks for sharing. Tell me more about your hobbies or interests and I can personalise your greeting.",
+    "I hear you! This reply comes from the offline fake model used for benchmarking, so no network call was made.",
+]
+
+_NAME_RE = re.compile(r"\b(?i:my name is|i am|i'm|call me)\s+([A-Z][a-zA-Z'\-]*)")
+_HOBBIES_RE = re.compile(r"\bi (?:love|enjoy|like)\s+([^.!?]+)", re.IGNORECASE)
+_INTERESTS_RE = re.compile(r"\binterested in\s+([^.!?]+)", re.IGNORECASE)
+_GREETING_RE = re.compile(r"\b(hi|hello|hey|greet|greeting)\b", re.IGNORECASE)
+
+
+class FakeLlm(BaseLlm):
+    """
+    A deterministic, offline stand-in for Gemini used for local testing and load benchmarks.
+
+    - Greeting-like turns produce a fetch_greeting function call (with name,
+      hobbies and interests extracted by simple rules); the turn after the
+      tool result echoes the greeting back as the final answer.
+    - Other turns get a scripted reply.
+    - Latency is simulated as a fixed time to first token plus a token rate,
+      and streaming mode yields partial chunks word by word.
+    - A configurable share of calls fails with a 429 RESOURCE_EXHAUSTED error,
+      to exercise rate limiting and retries, and another share returns no
+      output at all, to exercise model tier escalation.
+    """
+
+    first_token_latency_seconds: float = FAKE_MODEL_FIRST_TOKEN_LATENCY_SECONDS
+    tokens_per_second: float = FAKE_MODEL_TOKENS_PER_SECOND
+    emit_tool_calls: bool = FAKE_MODEL_EMIT_TOOL_CALLS
+    failure_rate: float = FAKE_MODEL_FAILURE_RATE
+    empty_rate: float = FAKE_MODEL_EMPTY_RATE
+    scripted_replies: List[str] = SCRIPTED_REPLIES
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"fake-.*"]
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.first_token_latency_seconds)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise genai_errors.ClientError(429, {"error": {"code": 429, "message": "Simulated quota exhaustion", "status": "RESOURCE_EXHAUSTED"}})
+        if self.empty_rate and random.random() < self.empty_rate:
+            yield LlmResponse(content=genai_types.Content(role="model", parts=[]))
+            return
+        last_content = llm_request.contents[-1] if llm_request.contents else None
+
+        tool_result = _function_response(last_content)
+        if tool_result is not None:
+            reply = tool_result.get("greeting") or tool_result.get("message") or "Done."
+        else:
+            user_text = _text_of(last_content)
+            tool_args = self._tool_args_for(user_text) if self.emit_tool_calls else None
+            if tool_args is not None:
+                call = genai_types.FunctionCall(name="fetch_greeting", args=tool_args)
+                yield LlmResponse(content=genai_types.Content(role="model", parts=[genai_types.Part(function_call=call)]))
+                return
+            reply = self.scripted_replies[zlib.crc32(user_text.encode("utf-8")) % len(self.scripted_replies)]
+
+        async for response in self._emit_text(reply, stream):
+            yield response
+
+    async def _emit_text(self, text: str, stream: bool) -> AsyncGenerator[LlmResponse, None]:
+        words = text.split(" ")
+        delay_per_token = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        if stream:
+            for index, word in enumerate(words):
+                await asyncio.sleep(delay_per_token)
+                chunk = word if index == len(words) - 1 else word + " "
+                yield LlmResponse(content=genai_types.Content(role="model", parts=[genai_types.Part(text=chunk)]), partial=True)
+        else:
+            await asyncio.sleep(delay_per_token * len(words))
+        yield LlmResponse(content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]))
+
+    def _tool_args_for(self, user_text: str) -> Optional[Dict[str, str]]:
+        args = {}
+        name = _NAME_RE.search(user_text)
+        if name:
+            args["name"] = name.group(1)
+        hobbies = _HOBBIES_RE.search(user_text)
+        if hobbies:
+            args["hobbies"] = hobbies.group(1).strip()
+        interests = _INTERESTS_RE.search(user_text)
+        if interests:
+            args["interests"] = interests.group(1).strip()
+        if args or _GREETING_RE.search(user_text):
+            return args
+        return None
+
+
+def _text_of(content: Optional[genai_types.Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if part.text)
+
+
+def _function_response(content: Optional[genai_types.Content]) -> Optional[Dict]:
+    if not content or not content.parts:
+        return None
+    for part in content.parts:
+        if part.function_response is not None:
+            return part.function_response.response or {}
+    return None
@@ -1,14 +1,45 @@
+from typing import Optional, Union
+
 from google.adk.agents import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.registry import LLMRegistry
 from tools.greeting_tools import fetch_greeting
-from config.settings import MODEL_GEMINI
+from agents.context_budget import create_context_budget
+from config.settings import MODEL_GEMINI, GREETING_AGENT_NAME, CONTEXT_TOKEN_BUDGET
+
+
+def resolve_model(model_name: str) -> Union[str, BaseLlm]:
+    """Map a configured model name to what Agent expects: Gemini names pass through, local backends are instantiated"""
+    if model_name.startswith("fake-"):
+        from agents.fake_model import FakeLlm  # Offline test backend; not imported in production
+
+        return FakeLlm(model=model_name)
+    if model_name.startswith("replay-"):
+        from agents.replay_model import ReplayLlm  # Plays back ADK_REPLAY_FILE; not imported in production
+
+        return ReplayLlm(model=model_name)
+    return model_name
 
 
-def create_greeting_agent():
-    """Create and return the greeting agent with proper configuration"""
+def create_model(model_name: str) -> BaseLlm:
+    """Instantiate the model backend for a configured model name"""
+    model = resolve_model(model_name)
+    return model if isinstance(model, BaseLlm) else LLMRegistry.new_llm(model)
+
+
+def create_greeting_agent(model_name: str = MODEL_GEMINI, token_budget: Optional[int] = CONTEXT_TOKEN_BUDGET):
+    """
+    Create and return the greeting agent with proper configuration
+
+    Args:
+        model_name: Gemini model name, or a local backend such as "fake-gemini" or "replay-gemini".
+        token_budget: Estimated prompt tokens above which older turns are compacted
+            into a summary; 0 or None sends the full history.
+    """
     
     root_agent = Agent(
-        name="greeting_agent",
-        model=MODEL_GEMINI,
+        name=GREETING_AGENT_NAME,
+        model=resolve_model(model_name),
         description="An agent that greets the user based on their name, hobbies, and interests.",
         instruction="""
         You are a helpful assistant that greets the user.
@@ -31,9 +62,7 @@ def create_greeting_agent():
         Always be friendly and helpful.
         """,
         tools=[fetch_greeting],  # Register the single tool
+        before_model_callback=create_context_budget(token_budget),
     )
     
     return root_agent
-
-
-print("Greeting agent module loaded successfully")
\ No newline at end of file
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import threading
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types as genai_types
+
+from services.recorder import read_recordings
+from utils.log import get_logger
+from config.settings import (
+    REPLAY_FILE,
+    REPLAY_SPEED,
+)
+
+log = get_logger(__name__)
+
+# One recorded model call: (delay before the response in seconds, whether it is partial, LlmResponse JSON)
+ModelCall = List[Tuple[float, bool, str]]
+
+_RESPONSE_FIELDS = frozenset(LlmResponse.model_fields)
+
+
+def split_model_calls(events: List[Dict[str, Any]]) -> List[ModelCall]:
+    """
+    Split a recorded turn's events into the model calls that produced them.
+
+    Model output events (partial chunks, then the complete response) belong
+    to the same call until a non-partial one ends it; tool response events in
+    between are the agent's own work and are not replayed. Each delay is the
+    time since the previous recorded event, so a replayed call waits as long
+    as the original took after the tool result (or turn start) it followed.
+
+    Args:
+        events: The "events" list of a recorded turn.
+
+    Returns:
+        The turn's model calls in order.
+    """
+    calls: List[ModelCall] = []
+    current: ModelCall = []
+    previous_t = 0.0
+    for recorded in events:
+        event = recorded["event"]
+        delay = max(recorded["t"] - previous_t, 0.0)
+        previous_t = recorded["t"]
+        content = event.get("content") or {}
+        if event.get("author") == "user" or (content.get("role") != "model" and not event.get("error_code")):
+            continue
+        response = {key: value for key, value in event.items() if key in _RESPONSE_FIELDS}
+        for part in (response.get("content") or {}).get("parts") or []:
+            if "function_call" in part:
+                part["function_call"].pop("id", None)  # ADK assigns fresh IDs to replayed calls
+        partial = bool(event.get("partial"))
+        current.append((delay, partial, json.dumps(response, separators=(",", ":"))))
+        if not partial:
+            calls.append(current)
+            current = []
+    return calls
+
+
+class ReplayLibrary:
+    """
+    Model calls from a recording, looked up by the prompt of the turn they answered.
+
+    If a prompt was recorded more than once, the first recording is used, so
+    replays are deterministic whatever order sessions run in.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._turns: Dict[str, List[ModelCall]] = {}
+        self._lock = threading.Lock()
+        for turn in read_recordings(path):
+            self._turns.setdefault(turn["prompt"], split_model_calls(turn["events"]))
+        self.hits = 0
+        self.misses = 0
+        log.info("replay.loaded", "Loaded %d recorded prompts", len(self._turns), path=path)
+
+    def lookup(self, prompt: str, step: int) -> Optional[ModelCall]:
+        """The step-th model call (0-based) of the turn recorded for prompt, or None."""
+        calls = self._turns.get(prompt)
+        call = calls[step] if calls is not None and step < len(calls) else None
+        with self._lock:
+            if call is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return call
+
+    def stats(self) -> Dict[str, Any]:
+        """Recorded prompts and calls replayed or missing."""
+        with self._lock:
+            return {"path": self.path, "prompts": len(self._turns), "hits": self.hits, "misses": self.misses}
+
+
+_libraries: Dict[str, ReplayLibrary] = {}
+_libraries_lock = threading.Lock()
+
+
+def get_replay_library(path: str = REPLAY_FILE) -> ReplayLibrary:
+    """Return the library for a recording file, loading it on first use."""
+    with _libraries_lock:
+        library = _libraries.get(path)
+        if library is None:
+            library = _libraries[path] = ReplayLibrary(path)
+        return library
+
+
+class ReplayLlm(BaseLlm):
+    """
+    Plays recorded model output back instead of calling a model.
+
+    Each request is matched to a recorded turn by its latest user prompt, and
+    to a model call within that turn by how many model responses follow that
+    prompt (0 for the first call, 1 after the first tool result, and so on).
+    Responses are replayed with their recorded delays divided by speed (0
+    skips the delays), so a recording of real sessions can be replayed at
+    high concurrency to catch latency and memory regressions in everything
+    around the model, offline and deterministically. A non-streaming request
+    skips recorded partial chunks and waits for their time in one go.
+
+    A request with no matching recording gets an error response with
+    error_code REPLAY_MISS, which ends the turn like a model error would.
+    """
+
+    recording_path: str = REPLAY_FILE
+    speed: float = REPLAY_SPEED
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"replay-.*"]
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        prompt, step = _prompt_and_step(llm_request.contents)
+        call = get_replay_library(self.recording_path).lookup(prompt, step)
+        if call is None:
+            log.warning("replay.miss", "No recorded model call for this prompt", prompt_chars=len(prompt), step=step)
+            yield LlmResponse(error_code="REPLAY_MISS", error_message=f"No recorded model call {step} for prompt {prompt[:80]!r}")
+            return
+
+        pending_delay = 0.0
+        for delay, partial, response_json in call:
+            pending_delay += delay
+            if partial and not stream:
+                continue
+            if self.speed > 0 and pending_delay > 0:
+                await asyncio.sleep(pending_delay / self.speed)
+            pending_delay = 0.0
+            yield LlmResponse.model_validate_json(response_json)  # A fresh object each time: ADK mutates responses
+
+
+def _prompt_and_step(contents: List[genai_types.Content]) -> Tuple[str, int]:
+    """The latest user prompt in a request and the number of model responses after it."""
+    for index in range(len(contents) - 1, -1, -1):
+        content = contents[index]
+        if content.role != "user" or not content.parts or any(part.function_response for part in content.parts):
+            continue
+        text = "".join(part.text for part in content.parts if part.text)
+        if text:
+            step = sum(1 for later in contents[index + 1:] if later.role == "model")
+            return text, step
+    return "", 0
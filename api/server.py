@@ -0,0 +1,182 @@
+"""
+ADK Greeting Chat Application - Headless HTTP/WebSocket API
+
+A standalone asyncio server that exposes agent turns without the Streamlit UI,
+for programmatic clients and load tests. All sessions share one Runner and
+are served concurrently on a single event loop.
+
+To run the server:
+    python -m api.server --host 0.0.0.0 --port 8080
+
+Endpoints:
+    POST /sessions      Create a session; returns its user_id and session_id
+    POST /chat          One turn: {"user_id", "session_id", "message"} -> {"reply", "latency_ms"}
+    POST /chat/batch    Many turns at once: {"items": [...]} -> {"results": [...]}
+    WS   /ws/chat       Streaming turns: send turn JSON, receive text/tool/final chunks
+    GET  /metrics       Latency histograms in Prometheus text format
+    GET  /healthz       Liveness check
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from utils.startup import get_startup_profiler
+
+get_startup_profiler()  # Installed before the imports it should time
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from services.adk_service import create_runner, ensure_session, open_model_clients, run_adk_async, stream_adk_async
+from services.metrics import get_metrics
+from services.session_manager import SessionPool
+from services.session_governor import SessionGovernor
+from utils.helpers import generate_session_id, generate_user_id, validate_user_input
+from utils.log import get_logger
+from config.settings import (
+    API_HOST,
+    API_PORT,
+    API_BATCH_MAX_ITEMS,
+    API_BATCH_CONCURRENCY,
+)
+
+log = get_logger(__name__)
+
+
+class SessionRequest(BaseModel):
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+class TurnRequest(BaseModel):
+    user_id: str
+    session_id: str
+    message: str
+
+
+class BatchRequest(BaseModel):
+    items: List[TurnRequest] = Field(default_factory=list)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.runner = create_runner()
+    app.state.session_pool = SessionPool()
+    app.state.session_governor = SessionGovernor(app.state.runner.session_service, app.state.session_pool)
+    app.state.session_governor.start()
+    open_model_clients(app.state.runner)
+    log.info("api.ready", "Runner ready, accepting requests")
+    get_startup_profiler().ready()
+    yield
+    app.state.session_governor.stop()
+    flush = getattr(app.state.runner.session_service, "flush", None)
+    if flush is not None:
+        await flush()
+
+
+app = FastAPI(title="ADK Greeting Chat API", lifespan=lifespan)
+
+
+async def _run_turn(turn: TurnRequest) -> Dict[str, Any]:
+    if not validate_user_input(turn.message):
+        raise HTTPException(status_code=400, detail="message must not be empty")
+    await ensure_session(app.state.runner, app.state.session_pool, turn.user_id, turn.session_id)
+    start = time.perf_counter()
+    reply = await run_adk_async(app.state.runner, turn.session_id, turn.message, turn.user_id)
+    return {
+        "user_id": turn.user_id,
+        "session_id": turn.session_id,
+        "reply": reply,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+@app.get("/healthz")
+async def healthz() -> Dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    return get_metrics().render_prometheus()
+
+
+@app.post("/sessions")
+async def create_session(request: SessionRequest) -> Dict[str, str]:
+    user_id = request.user_id or generate_user_id()
+    session_id = request.session_id or generate_session_id()
+    await ensure_session(app.state.runner, app.state.session_pool, user_id, session_id)
+    return {"user_id": user_id, "session_id": session_id}
+
+
+@app.post("/chat")
+async def chat(turn: TurnRequest) -> Dict[str, Any]:
+    return await _run_turn(turn)
+
+
+@app.post("/chat/batch")
+async def chat_batch(batch: BatchRequest) -> Dict[str, Any]:
+    if len(batch.items) > API_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"at most {API_BATCH_MAX_ITEMS} items per batch")
+    semaphore = asyncio.Semaphore(API_BATCH_CONCURRENCY)
+
+    async def _bounded(turn: TurnRequest) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await _run_turn(turn)
+            except HTTPException as e:
+                return {"user_id": turn.user_id, "session_id": turn.session_id, "error": e.detail}
+            except Exception as e:
+                log.exception("api.batch_turn_failed", "Batch turn failed", session_id=turn.session_id)
+                return {"user_id": turn.user_id, "session_id": turn.session_id, "error": str(e)}
+
+    results = await asyncio.gather(*(_bounded(turn) for turn in batch.items))
+    return {"results": results}
+
+
+@app.websocket("/ws/chat")
+async def chat_stream(websocket: WebSocket) -> None:
+    """
+    Streaming chat. Each message from the client is a turn
+    ({"user_id", "session_id", "message"}); the server answers with the chunks
+    of stream_adk_async ({"type": "text" | "tool_call" | "tool_result" | "final", ...}).
+    """
+    await websocket.accept()
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            try:
+                turn = TurnRequest(**payload)
+            except Exception as e:
+                await websocket.send_json({"type": "error", "message": f"invalid turn: {e}"})
+                continue
+            if not validate_user_input(turn.message):
+                await websocket.send_json({"type": "error", "message": "message must not be empty"})
+                continue
+            await ensure_session(app.state.runner, app.state.session_pool, turn.user_id, turn.session_id)
+            # If the client disconnects mid-turn, send_json raises and aclosing cancels
+            # the turn, including any admission wait, retry backoff or model call
+            async with aclosing(stream_adk_async(app.state.runner, turn.session_id, turn.message, turn.user_id)) as chunks:
+                async for chunk in chunks:
+                    await websocket.send_json(chunk)
+    except WebSocketDisconnect:
+        pass
+
+
+def main(argv=None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Headless HTTP/WebSocket API for the ADK greeting agent")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+    log.info("api.starting", "Starting ADK Greeting Chat API", host=args.host, port=args.port)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+ADK Greeting Chat Application - Batch/offline runner
+
+Replays a JSONL file of prompts through the shared Runner with bounded
+concurrency, for nightly regression and bulk-greeting jobs.
+
+- Input is streamed line by line and only a small window of items is in
+  flight, so memory stays flat however large the input is.
+- Each result is appended to the output JSONL as soon as it completes, with
+  its latency. Items whose id is already in the output are skipped, so an
+  interrupted run can simply be restarted; a session of its own that an
+  unfinished item left behind is recreated before the item runs again.
+- Every item runs in its own session unless it names a session_id (turns
+  sharing a session_id are serialized in input order).
+- Items share one user ID unless they name one, so the per-user admission
+  limit is lifted for the run (--user-rate); the global limit still applies.
+  An item rejected as busy is retried with backoff, on a fresh session if
+  it has its own.
+
+Usage:
+    python -m batch.runner --input prompts.jsonl --output results.jsonl --concurrency 16
+
+Input lines are JSON objects. The prompt is read from the first of
+"prompt", "message", "text" or "body" that is present, and the item id from
+"id" or "request_id" (falling back to the line number). Optional "user_id"
+and "session_id" fields pin an item to a session.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from utils.log import get_logger
+from config.settings import (
+    APP_NAME_FOR_ADK,
+    BATCH_DEFAULT_CONCURRENCY,
+    BATCH_USER_ID,
+    BATCH_USER_RATE_PER_SECOND,
+    BATCH_BUSY_RETRY_ATTEMPTS,
+)
+
+log = get_logger(__name__)
+
+PROMPT_FIELDS = ("prompt", "message", "text", "body")
+ID_FIELDS = ("id", "request_id")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a JSONL file of prompts through the ADK greeting agent")
+    parser.add_argument("--input", required=True, help="Input JSONL file of prompts")
+    parser.add_argument("--output", required=True, help="Output JSONL file (appended to; existing ids are skipped)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_DEFAULT_CONCURRENCY, help="Maximum turns in flight")
+    parser.add_argument("--limit", type=int, default=None, help="Process at most this many new items")
+    parser.add_argument("--user-rate", type=float, default=BATCH_USER_RATE_PER_SECOND,
+                        help="Per-user model calls/second admitted (0 disables the per-user limit)")
+    parser.add_argument("--busy-retries", type=int, default=BATCH_BUSY_RETRY_ATTEMPTS,
+                        help="Retries for items rejected as busy")
+    parser.add_argument("--keep-sessions", action="store_true", help="Do not delete per-item sessions after use")
+    parser.add_argument("--no-resume", action="store_true", help="Truncate the output instead of resuming")
+    return parser.parse_args(argv)
+
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """Ids already present in the output file, so a rerun resumes where it stopped."""
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                completed.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError, TypeError):
+                continue  # A partially written last line from an interrupted run
+    return completed
+
+
+def parse_item(line: str, line_number: int) -> Optional[Dict[str, Any]]:
+    """Extract id, prompt and optional session fields from one input line."""
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+    prompt = next((record[field] for field in PROMPT_FIELDS if record.get(field)), None)
+    if prompt is None:
+        return None
+    item_id = next((record[field] for field in ID_FIELDS if record.get(field) is not None), line_number)
+    return {
+        "id": str(item_id),
+        "prompt": str(prompt),
+        "user_id": record.get("user_id"),
+        "session_id": record.get("session_id"),
+    }
+
+
+async def iter_items(input_path: str, completed: Set[str]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """Stream pending items from the input file without loading it all."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = parse_item(line, line_number)
+            except ValueError as e:
+                log.warning("batch.line_skipped", "Skipping line %d: invalid input (%s)", line_number, e)
+                continue
+            if item is None:
+                log.warning("batch.line_skipped", "Skipping line %d: no prompt field", line_number)
+                continue
+            if item["id"] in completed:
+                continue
+            yield line_number, item
+            # Let workers make progress between lines of a large file
+            await asyncio.sleep(0)
+
+
+async def run_batch(args: argparse.Namespace) -> Dict[str, Any]:
+    from services.adk_service import BUSY_REPLY, ERROR_REPLY_PREFIXES, create_runner, run_adk_async
+    from services.admission import backoff_delay, get_admission_controller
+
+    get_admission_controller().set_user_rate(args.user_rate)
+    runner = create_runner()
+    session_service = runner.session_service
+    completed = set() if args.no_resume else load_completed_ids(args.output)
+    if completed:
+        log.info("batch.resuming", already_done=len(completed))
+
+    queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=args.concurrency * 2)
+    session_locks: Dict[str, list] = {}  # session_id -> [lock, waiting turns]
+    counters = {"ok": 0, "error": 0, "busy_retries": 0}
+    output = open(args.output, "w" if args.no_resume else "a", encoding="utf-8")
+
+    async def produce():
+        count = 0
+        async for _, item in iter_items(args.input, completed):
+            if args.limit is not None and count >= args.limit:
+                break
+            await queue.put(item)
+            count += 1
+        for _ in range(args.concurrency):
+            await queue.put(None)
+
+    async def process(item: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = item["user_id"] or BATCH_USER_ID
+        session_id = item["session_id"] or f"batch_{item['id']}"
+        own_session = item["session_id"] is None
+        ephemeral = own_session and not args.keep_sessions
+
+        async def new_session():
+            await session_service.create_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id, state={})
+
+        existing = await session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+        if existing is None:
+            await new_session()
+        elif own_session:
+            # Left half-written by an interrupted run (the item is not in the output); start it over
+            log.info("batch.session_reset", "Recreating a session left by an interrupted run", item_id=item["id"])
+            await session_service.delete_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+            await new_session()
+        start = time.perf_counter()
+        try:
+            attempt = 0
+            while True:
+                reply = await run_adk_async(runner, session_id, item["prompt"], user_id)
+                if reply != BUSY_REPLY or attempt >= args.busy_retries:
+                    break
+                attempt += 1
+                counters["busy_retries"] += 1
+                log.info("batch.busy_retry", "Item rejected as busy; retry %d/%d", attempt, args.busy_retries,
+                         item_id=item["id"])
+                await asyncio.sleep(backoff_delay(attempt))
+                if own_session:
+                    # Retry on a clean session rather than after the rejected turn
+                    await session_service.delete_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+                    await new_session()
+            status = "error" if reply.startswith(ERROR_REPLY_PREFIXES) else "ok"
+        finally:
+            if ephemeral:
+                await session_service.delete_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+        return {
+            "id": item["id"],
+            "session_id": session_id,
+            "status": status,
+            "reply": reply,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    async def run_serialized(item: Dict[str, Any]) -> Dict[str, Any]:
+        # Turns naming the same session_id run one at a time, in input order
+        key = item["session_id"]
+        entry = session_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await process(item)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                session_locks.pop(key, None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            try:
+                result = await (run_serialized(item) if item["session_id"] else process(item))
+            except Exception as e:
+                log.exception("batch.item_failed", item_id=item["id"])
+                result = {"id": item["id"], "status": "error", "error": str(e), "latency_ms": None}
+            counters[result["status"]] += 1
+            # One line per result, flushed immediately so a crash loses at most the in-flight items
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(produce(), *(worker() for _ in range(args.concurrency)))
+    finally:
+        output.close()
+        flush = getattr(session_service, "flush", None)
+        if flush is not None:
+            await flush()
+    elapsed = time.perf_counter() - start
+    processed = counters["ok"] + counters["error"]
+    return {
+        "processed": processed,
+        "ok": counters["ok"],
+        "errors": counters["error"],
+        "busy_retries": counters["busy_retries"],
+        "skipped_already_done": len(completed),
+        "elapsed_seconds": round(elapsed, 2),
+        "items_per_second": round(processed / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    summary = asyncio.run(run_batch(args))
+    print(f"✅ Batch complete: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
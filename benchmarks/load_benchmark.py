@@ -0,0 +1,288 @@
+"""
+End-to-end load benchmark for the ADK greeting app.
+
+Drives run_adk_async and the session layer with N concurrent simulated users
+against the offline fake model, so no network access is needed. Reports
+throughput, latency percentiles, memory growth per session and event-loop
+lag, and saves the results as JSON so runs can be compared over time.
+
+With --replay, users replay the sessions of a recording made with
+ADK_RECORD_FILE instead (user i repeats the prompts of recorded session
+i modulo the number of sessions) against the replay model, which plays the
+recorded output back at its recorded pace, or --replay-speed times faster.
+Recordings only hold turns that reached the model, so add --no-fast-path to
+send every replayed turn to it again.
+
+Usage:
+    python -m benchmarks.load_benchmark --users 50 --turns 5
+    python -m benchmarks.load_benchmark --users 200 --backend sqlite --no-fast-path
+    python -m benchmarks.load_benchmark --users 500 --replay adk_recording.jsonl --replay-speed 10 --no-fast-path
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+DEFAULT_PROMPTS = [
+    "Hi",
+    "My name is Alex",
+    "I love hiking and cooking",
+    "I'm interested in astronomy",
+    "What can you do?",
+    "Greet me",
+]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load benchmark for the ADK greeting app")
+    parser.add_argument("--users", type=int, default=20, help="Number of concurrent simulated users")
+    parser.add_argument("--turns", type=int, default=None,
+                        help="Turns per user (default 5; with --replay, the whole recorded session)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds each user waits between turns")
+    parser.add_argument("--model", default="fake-gemini", help="Model name (fake-* models run offline)")
+    parser.add_argument("--fast-model", default=None, help="Fast-tier model for simple turns (empty disables tiering)")
+    parser.add_argument("--first-token-latency", type=float, default=None, help="Fake model time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="Fake model token rate")
+    parser.add_argument("--no-tool-calls", action="store_true", help="Fake model never emits fetch_greeting calls")
+    parser.add_argument("--global-rate", type=float, default=None, help="Global model calls/second admitted (0 disables the limit)")
+    parser.add_argument("--user-rate", type=float, default=None, help="Per-user model calls/second admitted (0 disables the limit)")
+    parser.add_argument("--failure-rate", type=float, default=None, help="Share of fake model calls failing with a retryable 429")
+    parser.add_argument("--replay", default=None, metavar="FILE", help="Replay the sessions of a recording (ADK_RECORD_FILE)")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed-up (0 replays without delays)")
+    parser.add_argument("--no-fast-path", action="store_true", help="Disable the LLM-free greeting fast path")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory", help="Session service backend")
+    parser.add_argument("--trace-memory", action="store_true", help="Use tracemalloc for exact allocation growth (slower)")
+    parser.add_argument("--output", default=None, help="Path of the JSON results file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's per-turn console output")
+    args = parser.parse_args(argv)
+    if args.replay and args.model == parser.get_default("model"):
+        args.model = "replay-gemini"
+    if args.turns is None and not args.replay:
+        args.turns = 5
+    return args
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings are read from the environment at import time, so set them before importing the app."""
+    os.environ["ADK_MODEL"] = args.model
+    os.environ["ADK_FAST_PATH"] = "false" if args.no_fast_path else "true"
+    os.environ["ADK_METRICS_FILE"] = ""
+    # fetch_greeting writes profiles through to the profile store; keep them with the benchmark's own sessions
+    os.environ["ADK_PROFILE_STORE"] = args.backend
+    if args.backend == "sqlite":
+        args.db_dir = tempfile.mkdtemp(prefix="adk_bench_")
+        os.environ["ADK_SESSION_DB_PATH"] = os.path.join(args.db_dir, "bench_sessions.db")
+    if args.fast_model is not None:
+        os.environ["ADK_FAST_MODEL"] = args.fast_model
+    if args.first_token_latency is not None:
+        os.environ["FAKE_MODEL_FIRST_TOKEN_LATENCY_SECONDS"] = str(args.first_token_latency)
+    if args.tokens_per_second is not None:
+        os.environ["FAKE_MODEL_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    if args.no_tool_calls:
+        os.environ["FAKE_MODEL_EMIT_TOOL_CALLS"] = "false"
+    if args.global_rate is not None:
+        os.environ["ADK_GLOBAL_RATE_LIMIT"] = str(args.global_rate)
+    if args.user_rate is not None:
+        os.environ["ADK_USER_RATE_LIMIT"] = str(args.user_rate)
+    if args.failure_rate is not None:
+        os.environ["FAKE_MODEL_FAILURE_RATE"] = str(args.failure_rate)
+    if args.replay:
+        os.environ["ADK_REPLAY_FILE"] = args.replay
+        os.environ["ADK_REPLAY_SPEED"] = str(args.replay_speed)
+        os.environ["ADK_FAST_MODEL"] = args.fast_model or ""  # Recorded output already came from either tier
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of a list of seconds, in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(q):
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * q / 100) - 1))]
+
+    return {
+        "p50_ms": round(rank(50) * 1000, 2),
+        "p95_ms": round(rank(95) * 1000, 2),
+        "p99_ms": round(rank(99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float, lags: List[float]) -> None:
+    """Sample how late the event loop wakes a sleeping task: the loop's scheduling overhead."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+def user_prompts(user_index: int, args: argparse.Namespace, recorded_sessions: List[List[str]]) -> List[str]:
+    """The prompts a simulated user sends: a recorded session when replaying, otherwise DEFAULT_PROMPTS in turn."""
+    if recorded_sessions:
+        prompts = recorded_sessions[user_index % len(recorded_sessions)]
+        return prompts[:args.turns] if args.turns is not None else prompts
+    return [DEFAULT_PROMPTS[(user_index + turn) % len(DEFAULT_PROMPTS)] for turn in range(args.turns)]
+
+
+def load_recorded_sessions(path: str) -> List[List[str]]:
+    """The prompt sequence of each session in a recording, in the order the sessions started."""
+    from services.recorder import read_recordings
+
+    sessions: Dict[tuple, List[str]] = {}
+    for turn in sorted(read_recordings(path), key=lambda turn: turn["ts"]):
+        sessions.setdefault((turn["user_id"], turn["session_id"]), []).append(turn["prompt"])
+    return list(sessions.values())
+
+
+async def simulate_user(runner, run_adk_async, app_name: str, user_index: int, prompts: List[str],
+                        args: argparse.Namespace, latencies: List[float], errors: List[str], error_prefixes) -> None:
+    user_id = f"bench_user_{user_index}"
+    session_id = f"bench_session_{user_index}"
+    await runner.session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id, state={})
+    for prompt in prompts:
+        start = time.perf_counter()
+        reply = await run_adk_async(runner, session_id, prompt, user_id)
+        latencies.append(time.perf_counter() - start)
+        if reply.startswith(error_prefixes):
+            errors.append(reply)
+        if args.think_time:
+            await asyncio.sleep(args.think_time)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    from google.adk.sessions import InMemorySessionService
+
+    from config.settings import APP_NAME_FOR_ADK, SESSION_DB_PATH
+    from services.adk_service import ERROR_REPLY_PREFIXES, create_runner, run_adk_async
+    from services.admission import get_admission_controller
+    from services.metrics import get_metrics
+    from services.model_router import get_model_router
+    from services.profile_store import get_profile_store
+    from services.sqlite_session_service import SqliteSessionService
+
+    if args.backend == "sqlite":
+        session_service = SqliteSessionService(db_path=SESSION_DB_PATH)
+    else:
+        session_service = InMemorySessionService()
+    runner = create_runner(args.model, session_service=session_service)
+    recorded_sessions = load_recorded_sessions(args.replay) if args.replay else []
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    loop_lags: List[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop, 0.01, loop_lags))
+
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if args.trace_memory:
+        tracemalloc.start()
+    traced_before = tracemalloc.get_traced_memory()[0] if args.trace_memory else 0
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        simulate_user(runner, run_adk_async, APP_NAME_FOR_ADK, i, user_prompts(i, args, recorded_sessions), args,
+                      latencies, errors, ERROR_REPLY_PREFIXES)
+        for i in range(args.users)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_task
+    traced_after = tracemalloc.get_traced_memory()[0] if args.trace_memory else 0
+    if args.trace_memory:
+        tracemalloc.stop()
+    rss_after_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if isinstance(session_service, SqliteSessionService):
+        await session_service.flush()
+        session_service.close()
+    if args.backend == "sqlite":
+        get_profile_store().close()
+        shutil.rmtree(args.db_dir, ignore_errors=True)
+
+    memory = {"peak_rss_growth_per_session_kb": round((rss_after_kb - rss_before_kb) / max(args.users, 1), 2)}
+    if args.trace_memory:
+        memory["traced_growth_per_session_kb"] = round((traced_after - traced_before) / 1024 / max(args.users, 1), 2)
+
+    total_turns = len(latencies)
+    results = {
+        "turns": total_turns,
+        "errors": len(errors),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_turns_per_second": round(total_turns / elapsed, 2) if elapsed else 0.0,
+        "turn_latency": percentiles(latencies),
+        "event_loop_lag": percentiles(loop_lags),
+        "memory": memory,
+        "admission": get_admission_controller().stats(),
+        "model_tiers": get_model_router().stats(),
+        "breakdown": get_metrics().summary(),
+    }
+    if args.replay:
+        from agents.replay_model import get_replay_library
+
+        results["replay"] = dict(get_replay_library(args.replay).stats(), sessions=len(recorded_sessions))
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+        results = asyncio.run(run_benchmark(args))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Users: {args.users}  Turns/user: {args.turns or 'recorded'}  Model: {args.model}  Backend: {args.backend}")
+    print(f"Throughput: {results['throughput_turns_per_second']} turns/s  Errors: {results['errors']}")
+    print(f"Turn latency: {results['turn_latency']}")
+    print(f"Event loop lag: {results['event_loop_lag']}")
+    print(f"Memory: {results['memory']}")
+    print(f"Admission: {results['admission']}")
+    print(f"Model tiers: {results['model_tiers']}")
+    if "replay" in results:
+        print(f"Replay: {results['replay']}")
+    print(f"Results saved to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,143 @@
 import os
-import logging
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging to suppress most ADK internal logs, showing only errors
-logging.basicConfig(level=logging.ERROR)
-
 # Constants
 GREETING_FETCH_CACHE_STATE_KEY = "greeting_fetch_cache_state"
-MODEL_GEMINI = "gemini-1.5-flash"
+MODEL_GEMINI = os.environ.get("ADK_MODEL", "gemini-1.5-flash")  # "fake-gemini" selects the offline test model
+
+# Model tiering: simple turns go to a cheaper, faster model and escalate to MODEL_GEMINI
+# on empty, truncated or low-confidence output. An empty ADK_FAST_MODEL disables tiering.
+# A replayed recording already holds the output of whichever tier answered each turn, so replay runs untiered.
+MODEL_GEMINI_FAST = os.environ.get("ADK_FAST_MODEL", "fake-gemini-lite" if MODEL_GEMINI.startswith("fake-")
+                                   else "" if MODEL_GEMINI.startswith("replay-") else "gemini-1.5-flash-8b")
+MODEL_TIER_FAST_MAX_CHARS = 160  # Longer prompts go to the full model
+MODEL_TIER_FAST_MAX_TURNS = 12  # So do turns deep into a conversation
+MODEL_TIER_MIN_AVG_LOGPROB = -1.0  # Fast answers below this average log-probability are escalated
 APP_NAME_FOR_ADK = "greeting_app"
-USER_ID = "ketanraj"  # Consider making this dynamic in a real app
+GREETING_AGENT_NAME = "greeting_agent"
+USER_ID = "ketanraj"  # Default user for programmatic callers; browser sessions get their own ID
 
-# Initial state for ADK session
-INITIAL_STATE = {
-    "user_name": "Ketan Raj",
-    "user_hobbies": "Coding, Reading, Gaming",
-    "user_interests": "AI, Technology, Open Source"
-}
+# Per-agent prompt budget: above it, older turns are compacted into a rolling summary (0 disables)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("ADK_CONTEXT_TOKEN_BUDGET", "8000"))
+CONTEXT_CHARS_PER_TOKEN = 4
+CONTEXT_SUMMARY_MAX_CHARS = 2000
+CONTEXT_SUMMARY_SNIPPET_CHARS = 160
+# Session state keys that are always carried into the prompt, however much history is compacted
+PROFILE_STATE_KEYS = ("user_name", "user_hobbies", "user_interests")
+
+# Admission control for model calls: global and per-user token buckets (calls/second,
+# 0 disables), a concurrency cap and a bounded wait queue; plus retries and a per-turn deadline
+ADMISSION_GLOBAL_RATE_PER_SECOND = float(os.environ.get("ADK_GLOBAL_RATE_LIMIT", "10"))
+ADMISSION_GLOBAL_BURST = 20
+ADMISSION_USER_RATE_PER_SECOND = float(os.environ.get("ADK_USER_RATE_LIMIT", "1"))
+ADMISSION_USER_BURST = 5
+ADMISSION_MAX_CONCURRENT_CALLS = int(os.environ.get("ADK_MAX_CONCURRENT_MODEL_CALLS", "16"))
+ADMISSION_MAX_QUEUE = 64
+ADMISSION_QUEUE_TIMEOUT_SECONDS = 10.0
+MODEL_RETRY_MAX_ATTEMPTS = 3
+MODEL_RETRY_BASE_DELAY_SECONDS = 0.5
+MODEL_RETRY_MAX_DELAY_SECONDS = 8.0
+TURN_DEADLINE_SECONDS = float(os.environ.get("ADK_TURN_DEADLINE_SECONDS", "60"))
+
+# Offline fake model (selected when MODEL_GEMINI starts with "fake-")
+FAKE_MODEL_FIRST_TOKEN_LATENCY_SECONDS = float(os.environ.get("FAKE_MODEL_FIRST_TOKEN_LATENCY_SECONDS", "0.3"))
+FAKE_MODEL_TOKENS_PER_SECOND = float(os.environ.get("FAKE_MODEL_TOKENS_PER_SECOND", "50"))
+FAKE_MODEL_EMIT_TOOL_CALLS = os.environ.get("FAKE_MODEL_EMIT_TOOL_CALLS", "true").lower() == "true"
+FAKE_MODEL_FAILURE_RATE = float(os.environ.get("FAKE_MODEL_FAILURE_RATE", "0"))  # Share of calls failing with a 429
+FAKE_MODEL_EMPTY_RATE = float(os.environ.get("FAKE_MODEL_EMPTY_RATE", "0"))  # Share of calls returning no output
+
+# Record/replay of agent event streams. Recording appends each model turn's run_async events (with
+# timings) to RECORD_FILE; "replay-*" models (e.g. ADK_MODEL=replay-gemini) play REPLAY_FILE back offline.
+RECORD_FILE = os.environ.get("ADK_RECORD_FILE", "")  # Empty disables recording
+REPLAY_FILE = os.environ.get("ADK_REPLAY_FILE", "adk_recording.jsonl")
+REPLAY_SPEED = float(os.environ.get("ADK_REPLAY_SPEED", "1"))  # 1 = original timing, 10 = ten times faster, 0 = no delays
+
+# Headless HTTP/WebSocket API (python -m api.server)
+API_HOST = os.environ.get("ADK_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("ADK_API_PORT", "8080"))
+API_BATCH_MAX_ITEMS = 100
+API_BATCH_CONCURRENCY = 32
+
+# Offline JSONL batch runner (python -m batch.runner)
+BATCH_DEFAULT_CONCURRENCY = 16
+BATCH_USER_ID = "batch_user"
+BATCH_USER_RATE_PER_SECOND = 0.0  # Per-user admission limit during a batch (0 disables it; the global limit still applies)
+BATCH_BUSY_RETRY_ATTEMPTS = 5  # Items answered with the "busy" reply are retried with backoff up to this many times
 
 # Streamlit session keys
-MESSAGE_HISTORY_KEY = "messages_final_mem_v2"
 ADK_SESSION_KEY = "adk_session_id"
+ADK_USER_ID_KEY = "adk_user_id"
+ADK_USER_TOKEN_KEY = "adk_user_token"
+USER_TOKEN_QUERY_PARAM = "user"  # Page URL parameter holding the browser's user token; the ADK user ID is derived from it
+CHAT_HISTORY_VISIBLE_KEY = "chat_history_visible"
+
+# Windowed chat history: render only the most recent messages, with a pager for older ones
+CHAT_HISTORY_WINDOW_SIZE = 20
+CHAT_HISTORY_PAGE_SIZE = 20
+CHAT_HISTORY_EVENTS_PER_MESSAGE = 3  # Events fetched per message to show (prompt, reply, and a tool call/response pair per turn)
+CHAT_HISTORY_INDEX_CAPACITY = 10_000  # Sessions whose message count each process remembers
+
+# Pool of active per-browser ADK sessions sharing one Runner
+SESSION_POOL_MAX_SIZE = 256
+SESSION_POOL_IDLE_TTL_SECONDS = float(os.environ.get("ADK_SESSION_IDLE_TTL_SECONDS", 30 * 60))
+
+# Session memory governor: a background sweeper expires idle sessions, caps events per session
+# and evicts the coldest sessions while the pool's estimated memory is over budget
+SESSION_MEMORY_BUDGET_BYTES = int(float(os.environ.get("ADK_SESSION_MEMORY_BUDGET_MB", "256")) * 1024 * 1024)
+SESSION_MAX_EVENTS = int(os.environ.get("ADK_SESSION_MAX_EVENTS", "200"))  # 0 disables the cap
+HISTORY_DROPPED_STATE_KEY = "history_messages_dropped"  # Session state counting chat messages the cap has dropped
+SESSION_SWEEP_INTERVAL_SECONDS = 30.0
+SESSION_MEMORY_BYTES_PER_JSON_BYTE = 8  # Measured: an event's Python objects take ~8x its JSON encoding
+
+# Session storage backend: "sqlite" (durable, shared across restarts and workers) or "memory"
+SESSION_BACKEND = os.environ.get("ADK_SESSION_BACKEND", "sqlite")
+SESSION_DB_PATH = os.environ.get("ADK_SESSION_DB_PATH", "adk_sessions.db")
+SESSION_DB_BATCH_SIZE = 256
+SESSION_DB_FLUSH_INTERVAL_SECONDS = 0.05
+
+# User-scoped profile memory (PROFILE_STATE_KEYS) that seeds new sessions; "sqlite" shares the session database file
+PROFILE_STORE_BACKEND = os.environ.get("ADK_PROFILE_STORE", SESSION_BACKEND)
+PROFILE_DB_PATH = SESSION_DB_PATH
+PROFILE_CACHE_MAX_ENTRIES = 1024
+PROFILE_CACHE_TTL_SECONDS = 60.0
+
+# Background event loop used for all ADK coroutines
+EVENT_LOOP_THREAD_NAME = "adk-event-loop"
+EVENT_LOOP_DEFAULT_TIMEOUT_SECONDS = 120.0
+EVENT_LOOP_SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+# Stream partial agent output into the chat bubble as it is generated
+ENABLE_STREAMING = True
+STREAMING_CURSOR = "▌"
+
+# Answer plain greeting intents ("hi", "my name is X") locally via fetch_greeting, skipping the LLM
+ENABLE_FAST_PATH = os.environ.get("ADK_FAST_PATH", "true").lower() == "true"
+
+# Per-turn latency metrics (histograms exported in Prometheus text format)
+METRICS_BUCKETS_SECONDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+METRICS_RESERVOIR_SIZE = 2048  # Recent samples kept per series for p50/p95/p99
+METRICS_EXPORT_PATH = os.environ.get("ADK_METRICS_FILE", "adk_metrics.prom")  # Empty disables the file export
+METRICS_EXPORT_INTERVAL_SECONDS = 5.0
+METRICS_CALL_MAX_AGE_SECONDS = 600.0  # Model/tool calls still unfinished after this are dropped from tracking
+
+# Structured logging (utils/log.py): JSON lines written by a background thread
+LOG_LEVEL = os.environ.get("ADK_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("ADK_LOG_FORMAT", "json")  # "json" or "text"
+LOG_THIRD_PARTY_LEVEL = "ERROR"  # Suppress most ADK/genai internal logs, showing only errors
+LOG_QUEUE_MAX_SIZE = 10000  # Records beyond this are dropped rather than blocking the caller
+# Keep only a share of high-volume events, e.g. ADK_LOG_SAMPLE_RATES="turn.completed=0.1,tool.fetch_greeting=0.5"
+LOG_SAMPLE_RATES = {
+    event.strip(): float(rate)
+    for event, _, rate in (item.partition("=") for item in os.environ.get("ADK_LOG_SAMPLE_RATES", "").split(","))
+    if event.strip() and rate
+}
+
+# Startup profiling: per-module import times and time-to-ready, logged once the app is ready
+STARTUP_PROFILE = os.environ.get("ADK_PROFILE_STARTUP", "false").lower() == "true"
+STARTUP_PROFILE_TOP_MODULES = 25
 
 # # API Key validation
 # def get_api_key():
@@ -32,5 +146,3 @@ ADK_SESSION_KEY = "adk_session_id"
 #     if not api_key or "YOUR_GOOGLE_API_KEY" in api_key:
 #         return None
 #     return api_key
-
-print("Configuration loaded successfully")
\ No newline at end of file
@@ -6,19 +6,46 @@ Google Agent Development Kit (ADK) to provide a personalized greeting
 and chat interface.
 
 To run the application:
-    streamlit run main.py
+    python main.py [streamlit options, e.g. --server.port 8501]
+
+This builds the agent and Runner, starts the event loop and creates the
+model client before the server accepts connections, then starts Streamlit in
+the same process. `streamlit run main.py` also works, but then that work
+happens inside the first user's request.
+
+Set ADK_PROFILE_STARTUP=true to log per-module import times and
+time-to-ready once the app is ready.
 
 Make sure to:
 1. Install all dependencies: pip install -r requirements.txt
 2. Set up your .env file with GOOGLE_API_KEY
-3. Run the application with the command above
+3. Run the application with one of the commands above
 """
 
+import sys
+
+from utils.startup import get_startup_profiler
+
+get_startup_profiler()  # Installed before the imports it should time
+
+from streamlit import runtime
+
 from ui.streamlit_ui import run_streamlit_app
 
-print("Imports and Configuration done")
+
+def serve(streamlit_args) -> None:
+    """Warm up the agent and Runner, then start the Streamlit server on this script."""
+    from streamlit.web import cli
+    from services.adk_service import warm_up
+
+    warm_up()
+    get_startup_profiler().ready()
+    cli.main(args=["run", __file__, *streamlit_args], prog_name="streamlit")
+
 
 if __name__ == "__main__":
-    print("🚀 Starting ADK Greeting Chat Application...")
-    run_streamlit_app()
-    print("✅ Application started successfully!")
\ No newline at end of file
+    if runtime.exists():
+        # Executed by the Streamlit server for each script run
+        run_streamlit_app()
+    else:
+        serve(sys.argv[1:])
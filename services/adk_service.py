@@ -1,115 +1,352 @@
 # services/adk_service.py
 
-import os
-import asyncio # Make sure asyncio is imported
+import asyncio
+import atexit
+import threading
 import time
-import logging
-import streamlit as st
-from typing import Tuple
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import BaseSessionService, InMemorySessionService
 from google.adk.runners import Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types as genai_types
 
-from agents.greeting_agent import create_greeting_agent
+from agents.greeting_agent import create_greeting_agent, create_model
+from services.event_loop import get_event_loop, run_coroutine, iterate_async
+from services.session_manager import SessionPool
+from services.session_governor import SessionGovernor, release_evicted_sessions
+from services.sqlite_session_service import SqliteSessionService
+from services.intent_router import get_intent_router, try_fast_path
+from services.metrics import LatencyPlugin, get_metrics
+from services.turn_coordinator import get_turn_coordinator
+from services.admission import AdmissionRejectedError, admitted, current_user_id, get_admission_controller
+from services.model_router import FULL_TIER, TieredLlm, TurnTier, current_turn_tier, get_model_router
+from services.profile_store import get_profile_store, seed_state
+from services.chat_history import ChatMessage, load_history_window
+from services.recorder import record_events
+from utils.helpers import generate_session_id, generate_user_token, user_id_from_token
+from utils.log import get_logger
 from config.settings import (
     APP_NAME_FOR_ADK,
     USER_ID,
-    INITIAL_STATE,
-    ADK_SESSION_KEY
+    ADK_SESSION_KEY,
+    ADK_USER_ID_KEY,
+    ADK_USER_TOKEN_KEY,
+    USER_TOKEN_QUERY_PARAM,
+    SESSION_BACKEND,
+    ENABLE_FAST_PATH,
+    MODEL_GEMINI,
+    MODEL_GEMINI_FAST,
+    TURN_DEADLINE_SECONDS,
 )
 
+log = get_logger(__name__)
 
-@st.cache_resource
-def initialize_adk() -> Tuple[Runner, str]:
+# Replies that report a failed turn rather than an agent answer (used by batch and benchmark tooling)
+ERROR_REPLY_PREFIXES = ("Sorry, ", "Error:")
+TIMEOUT_REPLY = f"Sorry, the assistant did not finish within {TURN_DEADLINE_SECONDS:g} seconds. Please try again."
+BUSY_REPLY = "Sorry, the assistant is handling too many requests right now. Please try again in a moment."
+
+
+def create_runner(model_name: str = MODEL_GEMINI, fast_model_name: Optional[str] = MODEL_GEMINI_FAST,
+                  session_service: Optional[BaseSessionService] = None) -> Runner:
     """
-    Initializes the ADK Runner and InMemorySessionService for the application.
-    Manages the unique ADK session ID within the Streamlit session state.
+    Builds an ADK Runner around the greeting agent and the configured SessionService.
 
-    Returns:
-        tuple: (Runner instance, active ADK session ID)
+    Used by the Streamlit app (once per process, via get_shared_adk) and by
+    headless entry points such as the HTTP API server.
+
+    Args:
+        model_name: The full-tier model, used for every turn when tiering is off.
+        fast_model_name: The cheaper model for simple turns; empty or equal to
+            model_name disables tiering.
+        session_service: SessionService to use instead of the configured backend.
     """
-    print("--- ADK Init: Attempting to initialize Runner and Session Service... ---")
+    log.debug("init.runner_start", "Initializing Runner and Session Service")
 
-    # Create the greeting agent
-    root_agent = create_greeting_agent()
+    # Create the greeting agent; its model calls go through admission control
+    root_agent = create_greeting_agent(model_name)
+    full_model = admitted(root_agent.canonical_model)
+    if fast_model_name and fast_model_name != model_name:
+        root_agent.model = TieredLlm(model=full_model.model, fast=admitted(create_model(fast_model_name)),
+                                     full=full_model, router=get_model_router())
+        log.info("init.model_tiering", "Model tiering enabled", fast_model=fast_model_name, full_model=model_name)
+    else:
+        root_agent.model = full_model
 
-    session_service = InMemorySessionService()
     runner = Runner(
         agent=root_agent,
         app_name=APP_NAME_FOR_ADK,
-        session_service=session_service
+        session_service=session_service or create_session_service(),
+        plugins=[LatencyPlugin(get_metrics())],
     )
-    print("--- ADK Init: Runner and Session Service initialized successfully ---")
-
-    if ADK_SESSION_KEY not in st.session_state:
-        session_id = f"streamlit_adk_session_{int(time.time())}_{os.urandom(4).hex()}"
-        st.session_state[ADK_SESSION_KEY] = session_id
-        print(f"--- ADK Init: Created new session with ID: {st.session_state[ADK_SESSION_KEY]} ---")
-        try:
-            # Create the initial session record within the ADK session service
-            # AWAITING THE ASYNC CALL USING asyncio.run()
-            asyncio.run(session_service.create_session(
-                app_name=APP_NAME_FOR_ADK,
-                user_id=USER_ID,
-                session_id=session_id,
-                state={},  # Initial ADK session state is empty
-            ))
-            print(f"--- ADK Init: Successfully created new session in ADK SessionService. ---")
-            # AWAITING THE ASYNC CALL USING asyncio.run() FOR DEBUG PRINT
-            test_session_after_create = asyncio.run(session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=USER_ID, session_id=session_id))
-            print(f"--- ADK Init: DEBUG - Session immediately after initial creation: {test_session_after_create is not None} ---")
-        except Exception as e:
-            print(f"--- ADK Init: FATAL ERROR - Could not create initial session in ADK SessionService: {e} ---")
-            logging.exception("ADK Session Service create_session failed:")
-            raise  # Re-raise to stop app if session can't be created
-    else:
-        session_id = st.session_state[ADK_SESSION_KEY]
-        print(f"--- ADK Init: Reusing existing ADK session ID from Streamlit state: {session_id} ---")
-        # AWAITING THE ASYNC CALL USING asyncio.run()
-        if not asyncio.run(session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=USER_ID, session_id=session_id)):
-            print(f"--- ADK Init: WARNING - Session {session_id} not found in InMemorySessionService memory (likely due to script restart). Recreating session. State will be lost. ---")
+    log.info("init.runner_ready", "Runner and Session Service initialized", model_name=model_name)
+    return runner
+
+
+_shared_adk: Optional[Tuple[Runner, SessionPool]] = None
+_session_governor: Optional[SessionGovernor] = None
+_shared_adk_lock = threading.Lock()
+
+
+def get_shared_adk() -> Tuple[Runner, SessionPool]:
+    """
+    Returns the process-wide ADK Runner, SessionService and session pool,
+    building them on first call (normally from warm_up, before the first user).
+
+    A single Runner and agent are shared by every browser session; per-session
+    state lives in the SessionService under each session's own user ID. A
+    SessionGovernor sweeps the pool in the background to bound its memory.
+
+    Returns:
+        tuple: (Runner instance, SessionPool tracking active sessions)
+    """
+    global _shared_adk, _session_governor
+    with _shared_adk_lock:
+        if _shared_adk is None:
+            runner, session_pool = create_runner(), SessionPool()
+            _session_governor = SessionGovernor(runner.session_service, session_pool)
+            _session_governor.start()
+            _shared_adk = (runner, session_pool)
+    return _shared_adk
+
+
+def warm_up() -> Runner:
+    """
+    Does the first-request work of the Streamlit app ahead of time: builds the
+    agent, Runner and session pool, starts the background event loop and
+    creates the model clients, so the first user does not wait for them.
+    """
+    runner, _ = get_shared_adk()
+    get_event_loop()
+    open_model_clients(runner)
+    log.info("init.warm_up_complete", "Warm-up complete")
+    return runner
+
+
+def open_model_clients(runner: Runner) -> None:
+    """
+    Create the API clients of the agent's models now rather than inside the
+    first model call. Gemini builds its genai client lazily on first access;
+    wrappers (admission control, tiering) are unwrapped to reach every model.
+    """
+    pending = [runner.agent.model]
+    while pending:
+        model = pending.pop()
+        if isinstance(model, TieredLlm):
+            pending.extend([model.fast, model.full])
+        elif hasattr(model, "inner"):
+            pending.append(model.inner)
+        elif hasattr(type(model), "api_client"):
             try:
-                # AWAITING THE ASYNC CALL USING asyncio.run()
-                asyncio.run(session_service.create_session(
-                    app_name=APP_NAME_FOR_ADK,
-                    user_id=USER_ID,
-                    session_id=session_id,
-                    state=INITIAL_STATE  # Recreated session starts with initial state
-                ))
-                # AWAITING THE ASYNC CALL USING asyncio.run() FOR DEBUG PRINT
-                test_session_after_recreate = asyncio.run(session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=USER_ID, session_id=session_id))
-                print(f"--- ADK Init: DEBUG - Session immediately after recreation: {test_session_after_recreate is not None} ---")
+                model.api_client
             except Exception as e:
-                print(f"--- ADK Init: ERROR - Could not recreate missing session {session_id} in ADK SessionService: {e} ---")
-                logging.exception("ADK Session Service recreation failed:")
+                log.warning("init.model_client_failed", "Could not create the client for model %s: %s", model.model, e)
+
 
-    print(f"--- ADK Init: Initialization sequence complete. Runner is ready. Active Session ID: {session_id} ---")
-    return runner, session_id
+def create_session_service() -> BaseSessionService:
+    """Create the SessionService selected by SESSION_BACKEND."""
+    if SESSION_BACKEND == "sqlite":
+        session_service = SqliteSessionService()
+        atexit.register(session_service.close)  # Drain the write-behind queue on exit
+        return session_service
+    if SESSION_BACKEND != "memory":
+        log.warning("init.unknown_session_backend", "Unknown SESSION_BACKEND %r, falling back to in-memory sessions", SESSION_BACKEND)
+    return InMemorySessionService()
 
 
-async def run_adk_async(runner: Runner, session_id: str, user_message_text: str) -> str:
+async def ensure_session(runner: Runner, session_pool: SessionPool, user_id: str, session_id: str,
+                         state_if_missing: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Makes sure an ADK session exists and is admitted to the session pool.
+
+    Sessions already in the pool are trusted without a lookup. Otherwise the
+    SessionService is checked and the session created if it does not exist,
+    seeded with the user's stored profile. Sessions evicted from the pool to
+    make room are released; sessions with a turn running are never evicted.
+
+    Args:
+        runner: The shared ADK Runner.
+        session_pool: The pool tracking active sessions.
+        user_id: The ADK user ID owning the session.
+        session_id: The ADK session ID.
+        state_if_missing: Initial state used if the session has to be created;
+            the user's stored profile fields take precedence over it.
+
+    Returns:
+        True if the session had to be created, False if it already existed.
+    """
+    session_service = runner.session_service
+    already_pooled, evicted = session_pool.touch(user_id, session_id, busy=get_turn_coordinator().busy_sessions())
+    if evicted:
+        await release_evicted_sessions(session_service, evicted)
+    if already_pooled:
+        return False
+
+    if await session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id):
+        return False
+    profile = await get_profile_store().get(user_id)
+    if profile is not None:
+        log.debug("session.seeded", session_id=session_id, user_id=user_id, profile_version=profile.version)
+    try:
+        await session_service.create_session(
+            app_name=APP_NAME_FOR_ADK,
+            user_id=user_id,
+            session_id=session_id,
+            state=seed_state(state_if_missing, profile),
+        )
+    except Exception:
+        session_pool.discard(session_id)
+        raise
+    return True
+
+
+def initialize_adk() -> Tuple[Runner, str, str]:
+    """
+    Returns the shared ADK Runner together with the ADK session belonging to
+    the current Streamlit (browser) session, creating it if necessary.
+
+    Each Streamlit session gets its own session ID, stored in st.session_state.
+    The user is identified by a random token kept in the page URL (?user=...),
+    so a reload or a bookmarked link returns as the same user and the new
+    session is seeded with their stored profile. The user ID is derived from
+    the token; a missing or malformed token gets a fresh one, so a URL cannot
+    claim an arbitrary or default user ID. Whoever has the URL is that user
+    (see the profile store notes in the README). Sessions are admitted to the
+    shared SessionPool, and sessions evicted from the pool are released from
+    the SessionService.
+
+    Returns:
+        tuple: (Runner instance, active ADK session ID, ADK user ID)
+    """
+    import streamlit as st  # Only the Streamlit app needs it; headless entry points never call this
+
+    runner, session_pool = get_shared_adk()
+
+    if ADK_USER_ID_KEY not in st.session_state:
+        token = st.query_params.get(USER_TOKEN_QUERY_PARAM)
+        user_id = user_id_from_token(token)
+        if user_id is None:
+            if token:
+                log.warning("session.bad_user_token", "Ignoring a malformed user token in the page URL")
+            token = generate_user_token()
+            user_id = user_id_from_token(token)
+        st.session_state[ADK_USER_TOKEN_KEY] = token
+        st.session_state[ADK_USER_ID_KEY] = user_id
+    user_id = st.session_state[ADK_USER_ID_KEY]
+    if st.query_params.get(USER_TOKEN_QUERY_PARAM) != st.session_state[ADK_USER_TOKEN_KEY]:
+        st.query_params[USER_TOKEN_QUERY_PARAM] = st.session_state[ADK_USER_TOKEN_KEY]
+
+    is_new_session = ADK_SESSION_KEY not in st.session_state
+    if is_new_session:
+        st.session_state[ADK_SESSION_KEY] = generate_session_id()
+    session_id = st.session_state[ADK_SESSION_KEY]
+
+    # A session that went missing (evicted or lost in a script restart) is
+    # recreated like a new one, seeded with the user's stored profile
+    try:
+        created = run_coroutine(ensure_session(runner, session_pool, user_id, session_id))
+    except Exception:
+        log.exception("session.create_failed", "Could not create session in the ADK SessionService", session_id=session_id)
+        raise  # Re-raise to stop app if session can't be created
+
+    if created and is_new_session:
+        log.info("session.created", session_id=session_id, user_id=user_id)
+    elif created:
+        log.warning("session.recreated", "Session not found in SessionService (evicted or script restart); "
+                    "recreated it from the stored profile, conversation history was lost", session_id=session_id, user_id=user_id)
+
+    return runner, session_id, user_id
+
+
+def get_session_pool_stats() -> Dict[str, Any]:
+    """Occupancy and eviction counters of the shared session pool."""
+    _, session_pool = get_shared_adk()
+    return session_pool.stats()
+
+
+def get_session_memory_stats() -> Dict[str, Any]:
+    """Estimated memory and events held by pooled sessions, evictions and sweeper activity."""
+    _, session_pool = get_shared_adk()
+    return {**session_pool.stats(), **_session_governor.stats()}
+
+
+def get_intent_router_stats() -> Dict[str, Any]:
+    """Routing decisions and fast-path hit rate of the local intent router."""
+    return get_intent_router().stats()
+
+
+def get_turn_queue_stats() -> Dict[str, Any]:
+    """Per-session turn queue depth and duplicate-prompt coalescing counters."""
+    return get_turn_coordinator().stats()
+
+
+def get_admission_stats() -> Dict[str, Any]:
+    """Model calls in flight, waiting, admitted, rejected and retried."""
+    return get_admission_controller().stats()
+
+
+def get_model_tier_stats() -> Dict[str, Any]:
+    """Turns per model tier, routing reasons and escalations."""
+    return get_model_router().stats()
+
+
+def get_profile_store_stats() -> Dict[str, Any]:
+    """Profile cache occupancy, hit rate and write-throughs."""
+    return get_profile_store().stats()
+
+
+async def run_adk_async(runner: Runner, session_id: str, user_message_text: str, user_id: str = USER_ID) -> str:
     """
     Asynchronously executes one turn of the ADK agent conversation.
 
+    Turns on the same session run one at a time, and a prompt identical to one
+    still in flight on the session shares its reply.
+
     Args:
         runner: The initialized ADK Runner.
         session_id: The current ADK session ID.
         user_message_text: The text input from the user for this turn.
+        user_id: The ADK user ID owning the session.
 
     Returns:
         The agent's final text response as a string.
     """
-    print(f"\n--- ADK Run: Starting async execution for session {session_id} ---")
-    print(f"--- ADK Run: Processing User Query (truncated): '{user_message_text[:150]}...' ---")
+    return await get_turn_coordinator().run(
+        session_id, user_message_text, lambda: _run_turn_async(runner, session_id, user_message_text, user_id)
+    )
+
+
+async def _run_turn_async(runner: Runner, session_id: str, user_message_text: str, user_id: str) -> str:
+    """
+    Executes one turn of the ADK agent conversation (callers go through run_adk_async).
+
+    Args:
+        runner: The initialized ADK Runner.
+        session_id: The current ADK session ID.
+        user_message_text: The text input from the user for this turn.
+        user_id: The ADK user ID owning the session.
+
+    Returns:
+        The agent's final text response as a string.
+    """
+    log.debug("turn.start", session_id=session_id, streaming=False, prompt_chars=len(user_message_text))
+
+    metrics = get_metrics()
+    turn_start = time.perf_counter()
 
     # Retrieve the ADK session object to update its state
-    session = await runner.session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=USER_ID, session_id=session_id)
+    with metrics.span("adk_session_fetch_seconds"):
+        session = await runner.session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
     if not session:
         return "Error: ADK session not found. Please refresh the page."
 
-    print(f"--- ADK Run: Session state BEFORE agent run: {session.state} ---")
-    print(f"--- ADK Run: Updated ADK session state with Streamlit inputs: {session.state} ---")
+    if ENABLE_FAST_PATH:
+        fast_path_reply = await try_fast_path(get_intent_router(), runner, session, user_message_text)
+        if fast_path_reply is not None:
+            _record_turn(turn_start, session_id, "fast_path")
+            return fast_path_reply
 
     # Format the user's message for the ADK runner
     content = genai_types.Content(
@@ -117,36 +354,229 @@ async def run_adk_async(runner: Runner, session_id: str, user_message_text: str)
         parts=[genai_types.Part(text=user_message_text)]
     )
     final_response_text = "[Agent encountered an issue and did not produce a final response]"
-    start_time = time.time()  # Start timing
+    runner_start = time.perf_counter()
+    first_event_time = None
 
+    current_user_id.set(user_id)  # Model calls are rate limited per user
+    turn_tier = _choose_tier(runner, user_message_text, session)
     try:
-        async for event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content):
-            if event.is_final_response():
-                print(f"--- ADK Run: Final response event received. ---")
-                # Extract text from the final response event
-                if event.content and event.content.parts and hasattr(event.content.parts[0], 'text'):
-                    final_response_text = event.content.parts[0].text
-                else:
-                    final_response_text = "[Agent finished but produced no text output]"
-                    print(f"--- ADK Run: WARNING - Final event received, but no text content found. Event: {event} ---")
-                break  # Stop iterating after the final response
+        async with asyncio.timeout(TURN_DEADLINE_SECONDS), \
+                aclosing(record_events(runner.run_async(user_id=user_id, session_id=session_id, new_message=content),
+                                       user_id=user_id, session_id=session_id, prompt=user_message_text,
+                                       streaming=False)) as events:
+            async for event in events:
+                if first_event_time is None:
+                    first_event_time = time.perf_counter()
+                    metrics.observe("adk_time_to_first_event_seconds", first_event_time - runner_start,
+                                    model=_turn_model_name(runner, turn_tier))
+                if event.is_final_response():
+                    # Extract text from the final response event
+                    if event.error_code:
+                        final_response_text = _error_reply(event)
+                    elif event.content and event.content.parts and hasattr(event.content.parts[0], 'text'):
+                        final_response_text = event.content.parts[0].text
+                    else:
+                        final_response_text = "[Agent finished but produced no text output]"
+                        log.warning("turn.no_text", "Final event received, but no text content found",
+                                    session_id=session_id, event_id=event.id, author=event.author)
+                    break  # Stop iterating after the final response
+    except TimeoutError:
+        log.warning("turn.deadline_exceeded", "Turn exceeded its deadline and was cancelled",
+                    session_id=session_id, deadline_seconds=TURN_DEADLINE_SECONDS)
+        final_response_text = TIMEOUT_REPLY
+    except AdmissionRejectedError as e:
+        log.warning("turn.rejected", "%s", e, session_id=session_id)
+        final_response_text = BUSY_REPLY
     except Exception as e:
-        print(f"--- ADK Run: !! EXCEPTION during agent execution: {e} !! ---")
-        logging.exception("ADK runner.run_async failed:")
+        log.exception("turn.failed", "runner.run_async failed", session_id=session_id)
         final_response_text = f"Sorry, an error occurred while processing your request: {e}"
 
-    end_time = time.time()
-    duration = end_time - start_time
-    print(f"--- ADK Run: Turn execution completed in {duration:.2f} seconds. ---")
-    print(f"--- ADK Run: Final Response (truncated): '{final_response_text[:150]}...' ---")
+    _record_turn(turn_start, session_id, "model", turn_tier)
     return final_response_text
 
 
-def run_adk_sync(runner: Runner, session_id: str, user_message_text: str) -> str:
+async def stream_adk_async(runner: Runner, session_id: str, user_message_text: str, user_id: str = USER_ID) -> AsyncIterator[Dict[str, Any]]:
     """
-    Synchronous wrapper that executes the asynchronous run_adk_async function.
+    Asynchronously executes one turn of the ADK agent conversation in streaming mode.
+
+    Unlike run_adk_async, intermediate events are surfaced as they arrive so the
+    UI can render partial text and tool progress before the turn completes.
+    Turns are queued and coalesced per session as in run_adk_async; a coalesced
+    duplicate yields only the 'final' item.
+
+    Args:
+        runner: The initialized ADK Runner.
+        session_id: The current ADK session ID.
+        user_message_text: The text input from the user for this turn.
+        user_id: The ADK user ID owning the session.
+
+    Yields:
+        Dictionaries with a 'type' key:
+        - 'text': a partial text chunk in 'text'
+        - 'tool_call': a tool invocation with 'name' and 'args'
+        - 'tool_result': a tool result with 'name' and 'response'
+        - 'final': the complete response text in 'text' (always the last item)
     """
-    return asyncio.run(run_adk_async(runner, session_id, user_message_text))
+    async with aclosing(get_turn_coordinator().stream(
+        session_id, user_message_text, lambda: _stream_turn_async(runner, session_id, user_message_text, user_id)
+    )) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
+async def _stream_turn_async(runner: Runner, session_id: str, user_message_text: str, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """Executes one streaming turn (callers go through stream_adk_async)."""
+    log.debug("turn.start", session_id=session_id, streaming=True, prompt_chars=len(user_message_text))
+
+    metrics = get_metrics()
+    turn_start = time.perf_counter()
+
+    with metrics.span("adk_session_fetch_seconds"):
+        session = await runner.session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+    if not session:
+        yield {"type": "final", "text": "Error: ADK session not found. Please refresh the page."}
+        return
+
+    if ENABLE_FAST_PATH:
+        fast_path_reply = await try_fast_path(get_intent_router(), runner, session, user_message_text)
+        if fast_path_reply is not None:
+            _record_turn(turn_start, session_id, "fast_path")
+            yield {"type": "final", "text": fast_path_reply}
+            return
 
+    content = genai_types.Content(
+        role='user',
+        parts=[genai_types.Part(text=user_message_text)]
+    )
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    final_response_text = "[Agent encountered an issue and did not produce a final response]"
+    runner_start = time.perf_counter()
+    first_event_time = None
+    first_chunk_time = None
 
-print("✅ ADK Service initialization and helper functions defined.")
\ No newline at end of file
+    current_user_id.set(user_id)
+    turn_tier = _choose_tier(runner, user_message_text, session)
+    try:
+        async with asyncio.timeout(TURN_DEADLINE_SECONDS), \
+                aclosing(record_events(runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                                                        run_config=run_config),
+                                       user_id=user_id, session_id=session_id, prompt=user_message_text,
+                                       streaming=True)) as events:
+            async for event in events:
+                if first_event_time is None:
+                    first_event_time = time.perf_counter()
+                    metrics.observe("adk_time_to_first_event_seconds", first_event_time - runner_start,
+                                    model=_turn_model_name(runner, turn_tier))
+                for function_call in event.get_function_calls():
+                    yield {"type": "tool_call", "name": function_call.name, "args": dict(function_call.args or {})}
+                for function_response in event.get_function_responses():
+                    yield {"type": "tool_result", "name": function_response.name, "response": function_response.response}
+
+                text = _extract_event_text(event)
+                if event.partial:
+                    if text:
+                        if first_chunk_time is None:
+                            first_chunk_time = time.perf_counter()
+                            log.debug("turn.first_chunk", "First text chunk after %.2fs", first_chunk_time - runner_start,
+                                      session_id=session_id)
+                        yield {"type": "text", "text": text}
+                    continue
+
+                if event.is_final_response():
+                    if event.error_code:
+                        final_response_text = _error_reply(event)
+                    else:
+                        final_response_text = text if text else "[Agent finished but produced no text output]"
+                    break
+    except TimeoutError:
+        log.warning("turn.deadline_exceeded", "Turn exceeded its deadline and was cancelled",
+                    session_id=session_id, deadline_seconds=TURN_DEADLINE_SECONDS)
+        final_response_text = TIMEOUT_REPLY
+    except AdmissionRejectedError as e:
+        log.warning("turn.rejected", "%s", e, session_id=session_id)
+        final_response_text = BUSY_REPLY
+    except Exception as e:
+        log.exception("turn.failed", "runner.run_async (streaming) failed", session_id=session_id)
+        final_response_text = f"Sorry, an error occurred while processing your request: {e}"
+
+    _record_turn(turn_start, session_id, "model", turn_tier)
+    yield {"type": "final", "text": final_response_text}
+
+
+def _choose_tier(runner: Runner, user_message_text: str, session) -> Optional[TurnTier]:
+    """Pick the model tier for this turn when the agent's model is tiered."""
+    if not isinstance(runner.agent.model, TieredLlm):
+        return None
+    turn_tier = get_model_router().choose(user_message_text, session)
+    current_turn_tier.set(turn_tier)
+    log.debug("turn.tier_chosen", tier=turn_tier.tier, reason=turn_tier.reason)
+    return turn_tier
+
+
+def _turn_model_name(runner: Runner, turn_tier: Optional[TurnTier]) -> str:
+    """Name of the model answering the turn: with a tiered model, the tier in use so far (escalation included)."""
+    model = runner.agent.model
+    if isinstance(model, TieredLlm):
+        model = model.full if turn_tier is None or turn_tier.tier == FULL_TIER else model.fast
+    return model if isinstance(model, str) else model.model
+
+
+def _record_turn(turn_start: float, session_id: str, path: str, turn_tier: Optional[TurnTier] = None) -> None:
+    """Log the completed turn, record its latency (per path and model tier) and refresh the Prometheus export file."""
+    metrics = get_metrics()
+    labels = {"path": path}
+    if turn_tier is not None:
+        labels["tier"] = "fast_escalated" if turn_tier.escalated else turn_tier.tier
+    elapsed = time.perf_counter() - turn_start
+    metrics.observe("adk_turn_seconds", elapsed, **labels)
+    log.info("turn.completed", "Turn completed in %.3fs", elapsed, session_id=session_id, **labels)
+    metrics.export()
+
+
+def get_latency_summary() -> List[Dict[str, Any]]:
+    """p50/p95/p99 per latency metric, for the debug panel."""
+    return get_metrics().summary()
+
+
+def _error_reply(event) -> str:
+    """Reply for a turn the agent ended with an error event (ADK reports model failures this way)."""
+    if event.error_code == AdmissionRejectedError.__name__:
+        return BUSY_REPLY  # Logged by the admission controller
+    log.warning("turn.error_event", "Agent ended the turn with error %s: %s", event.error_code, event.error_message)
+    return f"Sorry, an error occurred while processing your request: {event.error_message or event.error_code}"
+
+
+def _extract_event_text(event) -> str:
+    """Concatenate the text parts of an ADK event, ignoring non-text parts."""
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if getattr(part, "text", None))
+
+
+def run_adk_sync(runner: Runner, session_id: str, user_message_text: str, user_id: str = USER_ID) -> str:
+    """
+    Synchronous wrapper that executes run_adk_async on the shared background event loop.
+
+    The loop outlives individual Streamlit reruns, so the Runner and the genai
+    client keep their connections warm between turns.
+    """
+    return run_coroutine(run_adk_async(runner, session_id, user_message_text, user_id))
+
+
+def stream_adk_sync(runner: Runner, session_id: str, user_message_text: str, user_id: str = USER_ID) -> Iterator[Dict[str, Any]]:
+    """
+    Synchronous iterator over stream_adk_async, driven on the shared background event loop.
+    """
+    return iterate_async(stream_adk_async(runner, session_id, user_message_text, user_id))
+
+
+def load_chat_history(runner: Runner, session_id: str, user_id: str, visible: int) -> Tuple[int, int, List[ChatMessage]]:
+    """
+    Synchronous wrapper that reads the visible window of a session's chat history
+    from its ADK events on the shared background event loop.
+
+    Returns:
+        tuple: (number of older messages not in the window, number of messages
+        dropped from the session, messages in the window)
+    """
+    return run_coroutine(load_history_window(runner, user_id, session_id, visible))
@@ -0,0 +1,275 @@
+# services/admission.py
+
+import asyncio
+import random
+import time
+from contextlib import aclosing, asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors as genai_errors
+
+from services.metrics import get_metrics
+from utils.log import get_logger
+from config.settings import (
+    ADMISSION_GLOBAL_RATE_PER_SECOND,
+    ADMISSION_GLOBAL_BURST,
+    ADMISSION_USER_RATE_PER_SECOND,
+    ADMISSION_USER_BURST,
+    ADMISSION_MAX_CONCURRENT_CALLS,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    MODEL_RETRY_MAX_ATTEMPTS,
+    MODEL_RETRY_BASE_DELAY_SECONDS,
+    MODEL_RETRY_MAX_DELAY_SECONDS,
+    USER_ID,
+)
+
+log = get_logger(__name__)
+
+# The ADK user a model call is made for; set per turn by the ADK service
+current_user_id: ContextVar[str] = ContextVar("adk_current_user_id", default=USER_ID)
+
+# When set (to [0.0]), model calls add the seconds they spend waiting for admission or retry backoff to it;
+# the turn recorder uses this to keep throttling out of recorded model timings
+admission_waited: ContextVar[Optional[List[float]]] = ContextVar("adk_admission_waited", default=None)
+
+# HTTP status codes worth retrying: timeouts, quota/rate limits and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Per-user buckets are pruned once there are more than this many
+_USER_BUCKET_PRUNE_THRESHOLD = 1024
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a model call cannot be admitted: the wait queue is full or the wait timed out."""
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `rate` tokens per second, holding at most `capacity`."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class AdmissionController:
+    """
+    Admission control for model calls.
+
+    A call is admitted once it holds a token from the global bucket and from
+    its user's bucket, and one of `max_concurrent` call slots. At most
+    `max_queue` calls may wait for admission; beyond that, and for calls that
+    wait longer than `queue_timeout_seconds`, AdmissionRejectedError is raised
+    at once so overload turns into fast failures instead of a growing backlog.
+    A rate of 0 disables that bucket.
+    """
+
+    def __init__(self,
+                 global_rate: float = ADMISSION_GLOBAL_RATE_PER_SECOND,
+                 global_burst: float = ADMISSION_GLOBAL_BURST,
+                 user_rate: float = ADMISSION_USER_RATE_PER_SECOND,
+                 user_burst: float = ADMISSION_USER_BURST,
+                 max_concurrent: int = ADMISSION_MAX_CONCURRENT_CALLS,
+                 max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout_seconds: float = ADMISSION_QUEUE_TIMEOUT_SECONDS):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._user_buckets: Dict[str, TokenBucket] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._in_flight = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._retries = 0
+
+    @asynccontextmanager
+    async def admit(self, user_id: str) -> AsyncIterator[None]:
+        """Hold an admission (rate tokens plus a call slot) for the duration of the block."""
+        if self._waiting >= self.max_queue:
+            self._reject("wait queue full")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)  # Created lazily, on the serving loop
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout_seconds
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._take_tokens(user_id, deadline)
+            remaining = deadline - loop.time()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                self._reject("timed out waiting for a free call slot")
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - start
+        get_metrics().observe("adk_admission_wait_seconds", waited)
+        _add_waited(waited)
+        self._admitted += 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def _take_tokens(self, user_id: str, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        user_bucket = self._user_bucket(user_id)
+        while True:
+            now = time.monotonic()
+            wait = max(self.global_bucket.wait_time(now), user_bucket.wait_time(now) if user_bucket else 0.0)
+            if wait == 0:
+                self.global_bucket.take()
+                if user_bucket is not None:
+                    user_bucket.take()
+                return
+            if loop.time() + wait > deadline:
+                self._reject("rate limit would delay the call past the queue timeout")
+            await asyncio.sleep(wait)
+
+    def _user_bucket(self, user_id: str) -> Optional[TokenBucket]:
+        if self.user_rate <= 0:
+            return None
+        bucket = self._user_buckets.get(user_id)
+        if bucket is None:
+            if len(self._user_buckets) >= _USER_BUCKET_PRUNE_THRESHOLD:
+                # A full bucket is indistinguishable from a fresh one, so it can be dropped
+                now = time.monotonic()
+                self._user_buckets = {uid: b for uid, b in self._user_buckets.items() if not b.is_full(now)}
+            bucket = self._user_buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _reject(self, reason: str) -> None:
+        self._rejected += 1
+        log.warning("admission.rejected", "Rejected model call (%s)", reason)
+        raise AdmissionRejectedError(f"Model call rejected: {reason}")
+
+    def set_user_rate(self, rate: float) -> None:
+        """Change the per-user rate (0 disables the per-user limit), e.g. for a batch job acting as one user."""
+        self.user_rate = rate
+        self._user_buckets = {}
+
+    def record_retry(self) -> None:
+        self._retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls in flight and waiting, plus cumulative admitted/rejected/retried counters."""
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "retries": self._retries,
+        }
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed model call is worth retrying (quota, timeout or transient server/network errors)."""
+    if isinstance(error, genai_errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (ConnectionError, asyncio.TimeoutError))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (1-based)."""
+    ceiling = min(MODEL_RETRY_MAX_DELAY_SECONDS, MODEL_RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+class AdmittedLlm(BaseLlm):
+    """
+    Wraps a model so that every call goes through the admission controller and
+    retryable failures are retried with exponential backoff and jitter.
+
+    A call is only retried if it failed before yielding anything, so a partly
+    streamed response is never duplicated. Cancellation (a turn deadline, or
+    the caller going away) interrupts the admission wait, the backoff sleep
+    and the model call alike, and is never retried.
+
+    A rejected call is an expected outcome under load rather than a fault, so
+    it ends the turn with an error response (error_code
+    "AdmissionRejectedError") instead of an exception the agent framework
+    would log with a traceback.
+    """
+
+    inner: BaseLlm
+    controller: AdmissionController
+    max_attempts: int = MODEL_RETRY_MAX_ATTEMPTS
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        user_id = current_user_id.get()
+        attempt = 1
+        while True:
+            yielded = False
+            try:
+                async with self.controller.admit(user_id):
+                    async with aclosing(self.inner.generate_content_async(llm_request, stream)) as responses:
+                        async for response in responses:
+                            yielded = True
+                            yield response
+                return
+            except AdmissionRejectedError as e:
+                yield LlmResponse(error_code=AdmissionRejectedError.__name__, error_message=str(e))
+                return
+            except Exception as e:
+                if yielded or attempt >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                self.controller.record_retry()
+                log.warning("admission.retry", "Model call failed (%s); retry %d/%d in %.2fs", e, attempt,
+                            self.max_attempts - 1, delay)
+                await asyncio.sleep(delay)
+                _add_waited(delay)
+                attempt += 1
+
+
+def _add_waited(seconds: float) -> None:
+    waited = admission_waited.get()
+    if waited is not None:
+        waited[0] += seconds
+
+
+def admitted(model: BaseLlm, controller: Optional[AdmissionController] = None) -> AdmittedLlm:
+    """Wrap a model so its calls go through admission control (the shared controller by default)."""
+    return AdmittedLlm(model=model.model, inner=model, controller=controller or get_admission_controller())
+
+
+_controller = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller shared by all model calls."""
+    return _controller
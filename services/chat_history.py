@@ -0,0 +1,146 @@
+# services/chat_history.py
+
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from config.settings import (
+    APP_NAME_FOR_ADK,
+    CHAT_HISTORY_EVENTS_PER_MESSAGE,
+    CHAT_HISTORY_INDEX_CAPACITY,
+    CHAT_HISTORY_PAGE_SIZE,
+    HISTORY_DROPPED_STATE_KEY,
+)
+
+
+class ChatMessage:
+    """One rendered chat bubble: 'user' or 'assistant', and its markdown text."""
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+
+def is_chat_message(event: Event) -> bool:
+    """Whether an event is shown in the chat: a user prompt or an agent's final text reply."""
+    if event.partial or not event.content or not event.content.parts:
+        return False
+    if event.author != "user" and (event.get_function_calls() or event.get_function_responses()):
+        return False
+    return any(part.text and not part.thought for part in event.content.parts)
+
+
+def to_chat_message(event: Event) -> ChatMessage:
+    text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+    return ChatMessage("user" if event.author == "user" else "assistant", text)
+
+
+def history_window_start(total: int, visible: int) -> int:
+    """
+    Index of the first message to render.
+
+    The start snaps down to a page boundary rather than sliding by one message
+    per turn, so already-rendered messages keep their element positions across
+    reruns and the Streamlit frontend only receives the new turn as a change.
+
+    Args:
+        total: Number of messages in the history.
+        visible: Minimum number of recent messages to show.
+
+    Returns:
+        The index of the oldest message in the window.
+    """
+    start = max(0, total - visible)
+    return start - start % CHAT_HISTORY_PAGE_SIZE
+
+
+class _MessageIndex:
+    """How many chat messages a session held up to a given event, counting any dropped since."""
+
+    __slots__ = ("last_event_id", "count")
+
+    def __init__(self, last_event_id: str, count: int):
+        self.last_event_id = last_event_id
+        self.count = count
+
+
+# Per-process message counts, so a rerun only scans the events added since the last one
+_indexes: "OrderedDict[Tuple[str, str], _MessageIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _count_since(events: List[Event], index: Optional[_MessageIndex]) -> Optional[int]:
+    """Messages in the session ending with events, if index's last event is among them; otherwise None."""
+    if index is None:
+        return None
+    for position in range(len(events) - 1, -1, -1):
+        if events[position].id == index.last_event_id:
+            return index.count + sum(1 for event in events[position + 1:] if is_chat_message(event))
+    return None
+
+
+def _remember(key: Tuple[str, str], events: List[Event], count: int) -> None:
+    if not events:
+        return
+    with _indexes_lock:
+        _indexes[key] = _MessageIndex(events[-1].id, count)
+        _indexes.move_to_end(key)
+        while len(_indexes) > CHAT_HISTORY_INDEX_CAPACITY:
+            _indexes.popitem(last=False)
+
+
+async def load_history_window(runner: Runner, user_id: str, session_id: str,
+                              visible: int) -> Tuple[int, int, List[ChatMessage]]:
+    """
+    Read the visible window of a session's chat history from its most recent ADK events.
+
+    Args:
+        runner: The shared ADK Runner (its session service holds the events).
+        user_id: The ADK user ID owning the session.
+        session_id: The ADK session ID.
+        visible: Minimum number of recent messages to show.
+
+    Returns:
+        tuple: (number of older messages not in the window, number of messages
+        dropped from the session, messages in the window)
+    """
+    key = (user_id, session_id)
+    with _indexes_lock:
+        index = _indexes.get(key)
+    wanted = visible + CHAT_HISTORY_PAGE_SIZE  # The window can start up to a page before `visible`
+    limit = wanted * CHAT_HISTORY_EVENTS_PER_MESSAGE
+    while True:
+        session = await runner.session_service.get_session(
+            app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id,
+            config=GetSessionConfig(num_recent_events=limit),
+        )
+        if session is None:
+            return 0, 0, []
+        events = session.events
+        dropped = session.state.get(HISTORY_DROPPED_STATE_KEY, 0)
+        complete = len(events) < limit
+        message_events: List[Event] = [event for event in events if is_chat_message(event)]
+        total = dropped + len(message_events) if complete else _count_since(events, index)
+        if total is None:
+            # Unknown session, or too much happened since it was last counted: count it once in full
+            full = await runner.session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+            if full is None:
+                return 0, 0, []
+            total = full.state.get(HISTORY_DROPPED_STATE_KEY, 0) + sum(1 for event in full.events if is_chat_message(event))
+            index = _MessageIndex(full.events[-1].id, total) if full.events else None
+            total = _count_since(events, index)
+            if total is None:  # Events arrived between the two reads
+                continue
+        start = max(history_window_start(total, visible), dropped)
+        if complete or len(message_events) >= total - start:
+            break
+        limit *= 2
+    _remember(key, events, total)
+    window = message_events[len(message_events) - (total - start):] if total > start else []
+    return start - dropped, dropped, [to_chat_message(event) for event in window]
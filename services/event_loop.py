@@ -0,0 +1,206 @@
+# services/event_loop.py
+
+import asyncio
+import atexit
+import concurrent.futures
+import queue
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from utils.log import get_logger
+from config.settings import (
+    EVENT_LOOP_THREAD_NAME,
+    EVENT_LOOP_DEFAULT_TIMEOUT_SECONDS,
+    EVENT_LOOP_SHUTDOWN_TIMEOUT_SECONDS,
+)
+
+T = TypeVar("T")
+
+log = get_logger(__name__)
+
+
+class BackgroundEventLoop:
+    """
+    A long-lived asyncio event loop hosted on a daemon thread.
+
+    Streamlit reruns the script on every interaction, so calling asyncio.run()
+    per turn would build and tear down a loop each time and drop any pooled
+    connections held by the genai client. Instead, coroutines are submitted to
+    this loop from the script thread and their results collected via futures.
+    """
+
+    def __init__(self, thread_name: str = EVENT_LOOP_THREAD_NAME):
+        self._thread_name = thread_name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The underlying event loop, starting the thread if necessary."""
+        self.start()
+        return self._loop
+
+    def is_running(self) -> bool:
+        """Whether the loop thread is alive and accepting work."""
+        return self._thread is not None and self._thread.is_alive() and self._loop.is_running()
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._started.clear()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run_loop, name=self._thread_name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+        log.info("event_loop.started", "Background loop started", thread_name=self._thread_name)
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """
+        Schedule a coroutine on the background loop without waiting for it.
+
+        Args:
+            coro: The coroutine to execute.
+
+        Returns:
+            A concurrent.futures.Future resolving to the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = EVENT_LOOP_DEFAULT_TIMEOUT_SECONDS) -> T:
+        """
+        Execute a coroutine on the background loop and block until it completes.
+
+        Args:
+            coro: The coroutine to execute.
+            timeout: Seconds to wait for the result. None waits indefinitely.
+
+        Returns:
+            The coroutine's result.
+
+        Raises:
+            TimeoutError: If the coroutine does not finish within the timeout.
+                The underlying task is cancelled before raising.
+        """
+        if self._loop is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("BackgroundEventLoop.run() cannot be called from the loop thread itself.")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Coroutine did not complete within {timeout} seconds")
+
+    def iterate(self, agen: AsyncIterator[T], timeout: Optional[float] = EVENT_LOOP_DEFAULT_TIMEOUT_SECONDS) -> Iterator[T]:
+        """
+        Drive an async generator on the background loop from synchronous code.
+
+        The generator is consumed by a single task on the loop (so context
+        variables set inside it stay valid across items) and its items are
+        handed over through a thread-safe queue. Each item is awaited with its
+        own timeout, so a long stream is fine as long as items keep arriving.
+        If the consumer stops early, the task is cancelled.
+
+        Args:
+            agen: The async generator to consume.
+            timeout: Seconds to wait for each item. None waits indefinitely.
+
+        Yields:
+            Items produced by the async generator.
+        """
+        items: "queue.Queue[tuple]" = queue.Queue()
+
+        async def _pump():
+            try:
+                async for item in agen:
+                    items.put(("item", item))
+            except BaseException as e:
+                items.put(("error", e))
+                raise
+            else:
+                items.put(("done", None))
+
+        future = self.submit(_pump())
+        try:
+            while True:
+                try:
+                    kind, value = items.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No item received from async generator within {timeout} seconds")
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            if not future.done():
+                future.cancel()
+
+    def shutdown(self, timeout: float = EVENT_LOOP_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Cancel outstanding tasks, stop the loop and join the thread.
+
+        Args:
+            timeout: Seconds to wait for pending tasks and the thread to finish.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            loop, thread = self._loop, self._thread
+
+        async def _cancel_pending():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_pending(), loop).result(timeout=timeout)
+        except Exception:
+            log.exception("event_loop.shutdown_failed", "Event loop shutdown did not drain pending tasks cleanly")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=timeout)
+        log.info("event_loop.stopped", "Background loop shut down")
+
+
+_event_loop: Optional[BackgroundEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> BackgroundEventLoop:
+    """Return the process-wide background event loop, starting it on first use."""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = BackgroundEventLoop()
+            atexit.register(_event_loop.shutdown)
+    _event_loop.start()
+    return _event_loop
+
+
+def run_coroutine(coro: Awaitable[T], timeout: Optional[float] = EVENT_LOOP_DEFAULT_TIMEOUT_SECONDS) -> T:
+    """Convenience wrapper that runs a coroutine on the shared background loop."""
+    return get_event_loop().run(coro, timeout=timeout)
+
+
+def iterate_async(agen: AsyncIterator[T], timeout: Optional[float] = EVENT_LOOP_DEFAULT_TIMEOUT_SECONDS) -> Iterator[T]:
+    """Convenience wrapper that consumes an async generator on the shared background loop."""
+    return get_event_loop().iterate(agen, timeout=timeout)
+
+
+def shutdown_event_loop() -> None:
+    """Shut down the shared background loop if it was started."""
+    if _event_loop is not None:
+        _event_loop.shutdown()
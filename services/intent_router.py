@@ -0,0 +1,171 @@
+# services/intent_router.py
+
+import re
+import threading
+import uuid
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import Session
+from google.adk.sessions.state import State
+from google.genai import types as genai_types
+
+from tools.greeting_tools import fetch_greeting
+from services.metrics import get_metrics
+from utils.log import get_logger
+from config.settings import GREETING_AGENT_NAME
+
+log = get_logger(__name__)
+
+# A classifier takes the raw user text and returns a routing decision such as
+# {"intent": "greeting", "args": {"name": "John"}, "rule": "my_name_is"}, or None.
+Classifier = Callable[[str], Optional[Dict[str, Any]]]
+
+_GREETING_PATTERN = re.compile(
+    r"^\s*(hi|hello|hey|hiya|howdy|greetings|good (morning|afternoon|evening)|"
+    r"greet me|give me a greeting|say hello)(\s+there)?[\s!.?]*$",
+    re.IGNORECASE,
+)
+_NAME_PATTERN = re.compile(
+    r"^\s*((hi|hello|hey)[\s,!.]*)?(my name is|my name's|call me)\s+"
+    r"(?P<name>[A-Za-z][A-Za-z'\-]*(\s+[A-Za-z][A-Za-z'\-]*){0,2})[\s!.]*$",
+    re.IGNORECASE,
+)
+
+# First words that mean "my name is ..." is not actually introducing a name
+_NOT_A_NAME = {"not", "a", "an", "the", "what", "secret", "unknown", "irrelevant"}
+
+
+def rule_based_classifier(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Deterministic keyword/regex classifier for the greeting intents that make
+    up most of our traffic ("hi", "greet me", "my name is X").
+
+    Anything more complex (hobbies, interests, questions) is left to the model.
+    """
+    if _GREETING_PATTERN.match(text):
+        return {"intent": "greeting", "args": {}, "rule": "greeting_keyword"}
+    match = _NAME_PATTERN.match(text)
+    if match and match.group("name").split()[0].lower() not in _NOT_A_NAME:
+        return {"intent": "greeting", "args": {"name": match.group("name").strip().title()}, "rule": "my_name_is"}
+    return None
+
+
+class IntentRouter:
+    """
+    Routes turns that match a known intent straight to the tool, skipping the LLM.
+
+    Classifiers are tried in order; the first one returning a decision wins.
+    Only the 'greeting' intent is handled (via fetch_greeting); unmatched turns
+    go to the model as before. Routing counters are kept for metrics.
+    """
+
+    def __init__(self, classifiers: Optional[List[Classifier]] = None):
+        self.classifiers: List[Classifier] = list(classifiers) if classifiers is not None else [rule_based_classifier]
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.passed_to_model = 0
+        self.rule_hits: Dict[str, int] = {}
+
+    def register_classifier(self, classifier: Classifier, first: bool = False) -> None:
+        """Add a classifier, e.g. a small local ML model, before or after the existing ones."""
+        if first:
+            self.classifiers.insert(0, classifier)
+        else:
+            self.classifiers.append(classifier)
+
+    def classify(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return the first routing decision for the text and record it, or None."""
+        decision = None
+        for classifier in self.classifiers:
+            try:
+                decision = classifier(text)
+            except Exception as e:
+                log.warning("intent_router.classifier_failed", "Classifier %s failed: %s",
+                            getattr(classifier, "__name__", classifier), e)
+                decision = None
+            if decision and decision.get("intent") == "greeting":
+                break
+            decision = None
+
+        with self._lock:
+            if decision:
+                self.routed += 1
+                rule = decision.get("rule", "unknown")
+                self.rule_hits[rule] = self.rule_hits.get(rule, 0) + 1
+            else:
+                self.passed_to_model += 1
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        """Return routing counters and the fast-path hit rate."""
+        with self._lock:
+            total = self.routed + self.passed_to_model
+            return {
+                "total": total,
+                "routed": self.routed,
+                "passed_to_model": self.passed_to_model,
+                "hit_rate": (self.routed / total) if total else 0.0,
+                "rule_hits": dict(self.rule_hits),
+            }
+
+
+async def try_fast_path(router: IntentRouter, runner: Runner, session: Session, user_message_text: str) -> Optional[str]:
+    """
+    Answer a turn without calling the model if the router recognises it.
+
+    fetch_greeting is called directly against the session state, and the turn
+    (user message plus the reply, carrying the tool's state delta) is appended
+    to the ADK session so the conversation history stays complete.
+
+    Args:
+        router: The IntentRouter deciding whether the turn can skip the model.
+        runner: The shared ADK Runner (its session service records the turn).
+        session: The current ADK session, as returned by get_session.
+        user_message_text: The text input from the user for this turn.
+
+    Returns:
+        The reply text if the turn was handled locally, otherwise None.
+    """
+    decision = router.classify(user_message_text)
+    if decision is None:
+        return None
+
+    log.debug("intent_router.fast_path", rule=decision.get("rule"), arg_names=tuple(sorted(decision["args"])))
+    state_delta: Dict[str, Any] = {}
+    tool_context = SimpleNamespace(state=State(value=dict(session.state), delta=state_delta), user_id=session.user_id)
+    with get_metrics().span("adk_tool_call_seconds", tool="fetch_greeting", status="fast_path"):
+        result = fetch_greeting(tool_context, **decision["args"])
+    if result.get("status") != "success":
+        # Let the model handle anything the tool could not
+        return None
+    reply_text = result["greeting"]
+
+    invocation_id = f"e-{uuid.uuid4()}"
+    user_event = Event(
+        invocation_id=invocation_id,
+        author="user",
+        content=genai_types.Content(role="user", parts=[genai_types.Part(text=user_message_text)]),
+    )
+    reply_event = Event(
+        invocation_id=invocation_id,
+        author=GREETING_AGENT_NAME,
+        content=genai_types.Content(role="model", parts=[genai_types.Part(text=reply_text)]),
+        actions=EventActions(state_delta=state_delta),
+    )
+    await runner.session_service.append_event(session, user_event)
+    await runner.session_service.append_event(session, reply_event)
+    return reply_text
+
+
+_intent_router: Optional[IntentRouter] = None
+
+
+def get_intent_router() -> IntentRouter:
+    """Return the process-wide IntentRouter."""
+    global _intent_router
+    if _intent_router is None:
+        _intent_router = IntentRouter()
+    return _intent_router
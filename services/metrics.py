@@ -0,0 +1,262 @@
+# services/metrics.py
+
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.plugins.base_plugin import BasePlugin
+
+from utils.log import get_logger
+from config.settings import (
+    METRICS_BUCKETS_SECONDS,
+    METRICS_RESERVOIR_SIZE,
+    METRICS_EXPORT_PATH,
+    METRICS_EXPORT_INTERVAL_SECONDS,
+    METRICS_CALL_MAX_AGE_SECONDS,
+)
+
+log = get_logger(__name__)
+
+# Metric names and their help text, as exported in the Prometheus text format
+METRIC_HELP = {
+    "adk_turn_seconds": "End-to-end latency of one chat turn.",
+    "adk_turn_queue_wait_seconds": "Time a turn waited for an earlier turn on the same session to finish.",
+    "adk_admission_wait_seconds": "Time a model call waited for rate-limit tokens and a free call slot.",
+    "adk_session_fetch_seconds": "Time to fetch the ADK session at the start of a turn.",
+    "adk_time_to_first_event_seconds": "Time from starting the runner to its first event.",
+    "adk_model_call_seconds": "Latency of a single model call.",
+    "adk_model_tier_call_seconds": "Latency of a model call per tier, and whether a fast-tier call was escalated.",
+    "adk_tool_call_seconds": "Latency of a single tool execution.",
+    "adk_render_seconds": "Time spent writing the response into the Streamlit UI.",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    A latency histogram with cumulative Prometheus buckets plus a bounded
+    reservoir of recent samples for p50/p95/p99.
+    """
+
+    def __init__(self, buckets: List[float] = METRICS_BUCKETS_SECONDS, reservoir_size: int = METRICS_RESERVOIR_SIZE):
+        self.buckets = sorted(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque = deque(maxlen=reservoir_size)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile over the recent samples, q in [0, 100]."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class MetricsRegistry:
+    """Thread-safe registry of labelled latency histograms."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+        self._export_lock = threading.Lock()
+        self._exporter: Optional[ThreadPoolExecutor] = None
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one latency sample (seconds) for a metric and label set."""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name: str, **labels: str) -> Iterator[None]:
+        """Time the enclosed block and record it under the given metric."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Return count and p50/p95/p99 (milliseconds) for every metric and label set."""
+        rows = []
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                p50, p95, p99 = (histogram.percentile(q) for q in (50, 95, 99))
+                rows.append({
+                    "metric": name,
+                    "labels": ",".join(f"{k}={v}" for k, v in labels),
+                    "count": histogram.count,
+                    "p50_ms": round(p50 * 1000, 1),
+                    "p95_ms": round(p95 * 1000, 1),
+                    "p99_ms": round(p99 * 1000, 1),
+                })
+        return rows
+
+    def render_prometheus(self) -> str:
+        """Render every histogram in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            by_name: Dict[str, List[Tuple[LabelKey, Histogram]]] = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                by_name.setdefault(name, []).append((labels, histogram))
+            for name, series in by_name.items():
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series:
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + [float("inf")], histogram.bucket_counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Optional[str] = METRICS_EXPORT_PATH, force: bool = False) -> Optional[Future]:
+        """
+        Write the Prometheus text to a file (for node_exporter's textfile collector
+        or a sidecar), at most once per METRICS_EXPORT_INTERVAL_SECONDS unless forced.
+
+        The text is rendered by the caller and written by a background thread,
+        so calling this from the event loop never waits on the disk.
+
+        Returns:
+            A future for the write, or None if no export was due.
+        """
+        if not path:
+            return None
+        now = time.monotonic()
+        with self._export_lock:
+            if not force and now - self._last_export < METRICS_EXPORT_INTERVAL_SECONDS:
+                return None
+            self._last_export = now
+            if self._exporter is None:
+                self._exporter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-export")
+        return self._exporter.submit(_write_atomically, path, self.render_prometheus())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+def _write_atomically(path: str, text: str) -> None:
+    """Replace path with text via a uniquely named temporary file, so scrapers never read a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile("w", dir=directory, prefix=f".{os.path.basename(path)}.",
+                                         suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        log.exception("metrics.export_failed", "Failed to export metrics file", path=path)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    escaped = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + escaped + "}"
+
+
+class LatencyPlugin(BasePlugin):
+    """
+    ADK Runner plugin that times every model call and tool execution.
+
+    Start times are keyed by invocation ID (model calls are sequential within
+    an invocation) and by function call ID (tools may run in parallel). A
+    call cut short by cancellation (a turn deadline, a closed stream) gets no
+    callback, so entries older than METRICS_CALL_MAX_AGE_SECONDS are dropped
+    as new calls start. The model label is read from the request when the
+    call finishes, after a tiered model has pointed it at the tier it used.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", max_age_seconds: float = METRICS_CALL_MAX_AGE_SECONDS):
+        super().__init__(name="latency_metrics")
+        self.registry = registry
+        self.max_age_seconds = max_age_seconds
+        self._model_starts: Dict[str, Tuple[float, LlmRequest]] = {}
+        self._tool_starts: Dict[str, Tuple[float, None]] = {}
+
+    def _start(self, starts: Dict[str, Tuple[float, Any]], key: str, value: Any) -> None:
+        now = time.perf_counter()
+        starts.pop(key, None)  # Re-insert at the end, so the dict stays ordered by start time
+        starts[key] = (now, value)
+        cutoff = now - self.max_age_seconds
+        while starts:
+            oldest = next(iter(starts))
+            if starts[oldest][0] >= cutoff:
+                break
+            del starts[oldest]
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self._start(self._model_starts, callback_context.invocation_id, llm_request)
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        # In streaming mode this fires per partial chunk; time the complete response only
+        if llm_response.partial:
+            return None
+        self._finish_model_call(callback_context.invocation_id, "ok")
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._finish_model_call(callback_context.invocation_id, "error")
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._start(self._tool_starts, tool_context.function_call_id, None)
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._finish_tool_call(tool.name, tool_context.function_call_id, "ok")
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._finish_tool_call(tool.name, tool_context.function_call_id, "error")
+        return None
+
+    def _finish_model_call(self, invocation_id: str, status: str) -> None:
+        started = self._model_starts.pop(invocation_id, None)
+        if started is not None:
+            start, llm_request = started
+            self.registry.observe("adk_model_call_seconds", time.perf_counter() - start,
+                                  model=llm_request.model or "unknown", status=status)
+
+    def _finish_tool_call(self, tool_name: str, function_call_id: str, status: str) -> None:
+        started = self._tool_starts.pop(function_call_id, None)
+        if started is not None:
+            start, _ = started
+            self.registry.observe("adk_tool_call_seconds", time.perf_counter() - start, tool=tool_name, status=status)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _registry
@@ -0,0 +1,246 @@
+# services/model_router.py
+
+import re
+import threading
+import time
+from contextlib import aclosing
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.sessions import Session
+from google.genai import types as genai_types
+
+from services.admission import AdmissionRejectedError
+from services.intent_router import rule_based_classifier
+from services.metrics import get_metrics
+from utils.log import get_logger
+from config.settings import (
+    MODEL_TIER_FAST_MAX_CHARS,
+    MODEL_TIER_FAST_MAX_TURNS,
+    MODEL_TIER_MIN_AVG_LOGPROB,
+)
+
+log = get_logger(__name__)
+
+FAST_TIER = "fast"
+FULL_TIER = "full"
+
+# A tier rule takes the user text and the number of earlier user turns in the
+# session, and returns (tier, reason) or None to defer to the next rule.
+TierRule = Callable[[str, int], Optional[Tuple[str, str]]]
+
+_COMPLEX_REQUEST_PATTERN = re.compile(
+    r"\b(explain|why|how (do|does|can|would|should)|compare|analy[sz]e|summari[sz]e|write|code|"
+    r"step by step|pros and cons|difference between)\b|```",
+    re.IGNORECASE,
+)
+
+# Finish reasons that mean the fast model's answer should not be trusted
+_ESCALATE_FINISH_REASONS = {
+    genai_types.FinishReason.MAX_TOKENS,
+    genai_types.FinishReason.MALFORMED_FUNCTION_CALL,
+    genai_types.FinishReason.SAFETY,
+    genai_types.FinishReason.RECITATION,
+}
+
+
+def greeting_intent_rule(text: str, depth: int) -> Optional[Tuple[str, str]]:
+    if rule_based_classifier(text):
+        return FAST_TIER, "greeting_intent"
+    return None
+
+
+def prompt_length_rule(text: str, depth: int) -> Optional[Tuple[str, str]]:
+    if len(text) > MODEL_TIER_FAST_MAX_CHARS:
+        return FULL_TIER, "long_prompt"
+    return None
+
+
+def conversation_depth_rule(text: str, depth: int) -> Optional[Tuple[str, str]]:
+    if depth >= MODEL_TIER_FAST_MAX_TURNS:
+        return FULL_TIER, "deep_conversation"
+    return None
+
+
+def complex_request_rule(text: str, depth: int) -> Optional[Tuple[str, str]]:
+    if _COMPLEX_REQUEST_PATTERN.search(text):
+        return FULL_TIER, "complex_request"
+    return None
+
+
+DEFAULT_TIER_RULES: List[TierRule] = [greeting_intent_rule, prompt_length_rule, conversation_depth_rule, complex_request_rule]
+
+
+class TurnTier:
+    """The tier chosen for one turn; escalation upgrades it for the rest of the turn."""
+
+    __slots__ = ("tier", "reason", "escalated")
+
+    def __init__(self, tier: str, reason: str):
+        self.tier = tier
+        self.reason = reason
+        self.escalated = False
+
+
+# The tier of the turn being run; set per turn by the ADK service
+current_turn_tier: ContextVar[Optional[TurnTier]] = ContextVar("adk_current_turn_tier", default=None)
+
+
+class ModelTierRouter:
+    """
+    Picks a model tier per turn from configurable heuristics.
+
+    Rules are tried in order and the first decision wins; a turn no rule
+    claims is short chit-chat and goes to the fast tier. Per-tier turn counts,
+    rule hits and escalations are kept so the thresholds can be tuned.
+    """
+
+    def __init__(self, rules: Optional[List[TierRule]] = None):
+        self.rules: List[TierRule] = list(rules) if rules is not None else list(DEFAULT_TIER_RULES)
+        self._lock = threading.Lock()
+        self.tier_turns: Dict[str, int] = {FAST_TIER: 0, FULL_TIER: 0}
+        self.reason_hits: Dict[str, int] = {}
+        self.escalations: Dict[str, int] = {}
+
+    def register_rule(self, rule: TierRule, first: bool = False) -> None:
+        """Add a tier rule before or after the existing ones."""
+        if first:
+            self.rules.insert(0, rule)
+        else:
+            self.rules.append(rule)
+
+    def choose(self, text: str, session: Optional[Session]) -> TurnTier:
+        """Return the tier for a turn and record the decision."""
+        depth = sum(1 for event in session.events if event.author == "user") if session else 0
+        decision = None
+        for rule in self.rules:
+            try:
+                decision = rule(text, depth)
+            except Exception as e:
+                log.warning("model_router.rule_failed", "Tier rule %s failed: %s", getattr(rule, "__name__", rule), e)
+                decision = None
+            if decision:
+                break
+        tier, reason = decision or (FAST_TIER, "short_chat")
+        with self._lock:
+            self.tier_turns[tier] = self.tier_turns.get(tier, 0) + 1
+            self.reason_hits[reason] = self.reason_hits.get(reason, 0) + 1
+        return TurnTier(tier, reason)
+
+    def record_escalation(self, reason: str) -> None:
+        with self._lock:
+            self.escalations[reason] = self.escalations.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-tier turn counts, rule hits and the escalation rate of fast-tier turns."""
+        with self._lock:
+            escalated = sum(self.escalations.values())
+            fast_turns = self.tier_turns.get(FAST_TIER, 0)
+            return {
+                "tier_turns": dict(self.tier_turns),
+                "reason_hits": dict(self.reason_hits),
+                "escalations": dict(self.escalations),
+                "escalation_rate": (escalated / fast_turns) if fast_turns else 0.0,
+            }
+
+
+class TieredLlm(BaseLlm):
+    """
+    Sends each model call to the tier chosen for the current turn.
+
+    A fast-tier call is escalated to the full tier, before anything is passed
+    on, when its output is empty, ends with an untrustworthy finish reason, has
+    an average log-probability below MODEL_TIER_MIN_AVG_LOGPROB, or fails. Once
+    escalated, the rest of the turn stays on the full tier. Each call's latency
+    is recorded per tier and outcome.
+    """
+
+    fast: BaseLlm
+    full: BaseLlm
+    router: ModelTierRouter
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        turn_tier = current_turn_tier.get()
+        if turn_tier is not None and turn_tier.tier == FAST_TIER:
+            buffered: Optional[List[LlmResponse]] = []
+            escalation = None
+            start = time.perf_counter()
+            llm_request.model = self.fast.model
+            try:
+                async with aclosing(self.fast.generate_content_async(llm_request, stream)) as responses:
+                    async for response in responses:
+                        if buffered is None:
+                            yield response
+                            continue
+                        if response.error_code == AdmissionRejectedError.__name__:
+                            yield response  # Overloaded; escalating would only add load
+                            return
+                        escalation = _escalation_reason(response)
+                        if escalation:
+                            break
+                        buffered.append(response)
+                        if _has_output(response):
+                            # Trusted output: release what was held back and pass the rest straight through
+                            held, buffered = buffered, None
+                            for response in held:
+                                yield response
+                if buffered is not None and escalation is None:
+                    escalation = "empty_output"
+            except AdmissionRejectedError:
+                raise  # Overloaded; escalating would only add load
+            except Exception as e:
+                if buffered is None:
+                    raise
+                escalation = f"error:{type(e).__name__}"
+            finally:
+                # Also reached when the caller closes the stream after the final response
+                get_metrics().observe("adk_model_tier_call_seconds", time.perf_counter() - start,
+                                      tier=FAST_TIER, outcome="escalated" if escalation else "ok")
+            if escalation is None:
+                return
+            log.info("model_router.escalated", "Escalating turn from the fast to the full tier", reason=escalation)
+            self.router.record_escalation(escalation.split(":")[0])
+            turn_tier.tier = FULL_TIER
+            turn_tier.escalated = True
+
+        start = time.perf_counter()
+        outcome = "ok"
+        llm_request.model = self.full.model
+        try:
+            async with aclosing(self.full.generate_content_async(llm_request, stream)) as responses:
+                async for response in responses:
+                    yield response
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            get_metrics().observe("adk_model_tier_call_seconds", time.perf_counter() - start, tier=FULL_TIER, outcome=outcome)
+
+
+def _has_output(response: LlmResponse) -> bool:
+    parts = response.content.parts if response.content and response.content.parts else []
+    return any((part.text and part.text.strip() and not part.thought) or part.function_call for part in parts)
+
+
+def _escalation_reason(response: LlmResponse) -> Optional[str]:
+    """Why a fast-tier response should not be used, or None if it is fine so far."""
+    if response.error_code:
+        return f"error:{response.error_code}"
+    if response.partial:
+        return None
+    if response.finish_reason in _ESCALATE_FINISH_REASONS:
+        return f"finish_reason:{response.finish_reason.name}"
+    if response.avg_logprobs is not None and response.avg_logprobs < MODEL_TIER_MIN_AVG_LOGPROB:
+        return "low_confidence"
+    return None
+
+
+_router = ModelTierRouter()
+
+
+def get_model_router() -> ModelTierRouter:
+    """Return the shared model tier router."""
+    return _router
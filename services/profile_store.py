@@ -0,0 +1,210 @@
+# services/profile_store.py
+
+import asyncio
+import concurrent.futures
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+from utils.log import get_logger
+from config.settings import (
+    PROFILE_STATE_KEYS,
+    PROFILE_STORE_BACKEND,
+    PROFILE_DB_PATH,
+    PROFILE_CACHE_MAX_ENTRIES,
+    PROFILE_CACHE_TTL_SECONDS,
+)
+
+log = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_profiles (
+    user_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    update_time REAL NOT NULL
+);
+"""
+
+
+class UserProfile:
+    """A user's profile fields (the PROFILE_STATE_KEYS they have set) and its version stamp."""
+
+    __slots__ = ("fields", "version", "loaded_at")
+
+    def __init__(self, fields: Dict[str, Any], version: int, loaded_at: float):
+        self.fields = fields
+        self.version = version
+        self.loaded_at = loaded_at
+
+
+class ProfileStore:
+    """
+    User-scoped profile memory that outlives sessions.
+
+    fetch_greeting writes profile updates through to the store, and new
+    sessions are seeded from it, so a returning user's first turn already has
+    their name, hobbies and interests in state. Each write bumps the profile's
+    version stamp. Updates apply to the cache at once and are written to the
+    database by a dedicated writer thread, so the tool that makes them never
+    waits on the database (which it shares with the session writer).
+
+    Reads go through an in-process LRU cache of PROFILE_CACHE_MAX_ENTRIES
+    profiles. With the sqlite backend the profile table is shared by every
+    worker process, so cached entries are re-read after
+    PROFILE_CACHE_TTL_SECONDS to pick up writes made elsewhere; the memory
+    backend keeps profiles in the cache alone and never expires them.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = PROFILE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = PROFILE_CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._cache: "OrderedDict[str, UserProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writer: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            # One thread, so writes are applied in the order they were made
+            self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+            log.info("profile_store.opened", db_path=db_path)
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    async def get(self, user_id: str) -> Optional[UserProfile]:
+        """Return the user's profile (from the cache when fresh), or None if they have none."""
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and (self._conn is None or time.monotonic() - cached.loaded_at < self.ttl_seconds):
+                self._cache.move_to_end(user_id)
+                self.hits += 1
+                return cached if cached.fields else None
+            self.misses += 1
+        if self._conn is None:
+            return None
+
+        row = await asyncio.to_thread(self._read, user_id)
+        profile = UserProfile(json.loads(row[0]) if row else {}, row[1] if row else 0, time.monotonic())
+        with self._lock:
+            current = self._cache.get(user_id)
+            if current is None or current.version <= profile.version:
+                self._put(user_id, profile)  # Negative results are cached too
+        return profile if profile.fields else None
+
+    def update(self, user_id: str, changes: Mapping[str, Any]) -> Optional[UserProfile]:
+        """
+        Apply profile changes to the cache and queue their write to the store.
+
+        Only PROFILE_STATE_KEYS with a value are kept. fetch_greeting calls this
+        on the event loop, so it never touches the database: the cached profile
+        is updated at once (the user's next session in this process sees it)
+        and the writer thread merges the changes into the stored row, after
+        which the cache holds the stored profile and its version.
+
+        Args:
+            user_id: The ADK user ID the profile belongs to.
+            changes: Profile fields to set, e.g. {"user_name": "John"}.
+
+        Returns:
+            The updated profile, or None if there was nothing to write.
+        """
+        changes = {key: value for key, value in changes.items() if key in PROFILE_STATE_KEYS and value}
+        if not user_id or not changes:
+            return None
+        with self._lock:
+            current = self._cache.get(user_id)
+            fields = {**(current.fields if current else {}), **changes}
+            version = (current.version if current else 0) + 1
+            profile = UserProfile(fields, version, time.monotonic())
+            self._put(user_id, profile)
+            self.writes += 1
+        if self._writer is not None:
+            self._writer.submit(self._write, user_id, changes)
+        log.info("profile_store.saved", user_id=user_id, version=version, fields=tuple(sorted(changes)))
+        return profile
+
+    def _write(self, user_id: str, changes: Dict[str, Any]) -> None:
+        """Merge changes into the stored profile (on the writer thread) and cache the result."""
+        try:
+            with self._db_lock, self._conn:
+                row = self._conn.execute("SELECT profile, version FROM user_profiles WHERE user_id = ?", (user_id,)).fetchone()
+                fields = {**(json.loads(row[0]) if row else {}), **changes}
+                version = (row[1] if row else 0) + 1
+                self._conn.execute(
+                    "INSERT INTO user_profiles (user_id, profile, version, update_time) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET profile = excluded.profile, version = excluded.version, "
+                    "update_time = excluded.update_time",
+                    (user_id, json.dumps(fields), version, time.time()),
+                )
+        except Exception:
+            log.exception("profile_store.write_failed", "Could not save profile changes", user_id=user_id)
+            return
+        with self._lock:
+            current = self._cache.get(user_id)
+            # A later update still waiting to be written already holds these changes
+            if current is None or current.version <= version:
+                self._put(user_id, UserProfile(fields, version, time.monotonic()))
+
+    def _read(self, user_id: str):
+        with self._db_lock:
+            return self._conn.execute("SELECT profile, version FROM user_profiles WHERE user_id = ?", (user_id,)).fetchone()
+
+    def _put(self, user_id: str, profile: UserProfile) -> None:
+        self._cache[user_id] = profile
+        self._cache.move_to_end(user_id)
+        # The memory backend has no other copy, so its profiles are never dropped
+        while self._conn is not None and len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache occupancy, hit rate and write-through count."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "writes": self.writes,
+            }
+
+    def close(self) -> None:
+        """Finish queued writes and close the database."""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+            self._conn = None
+
+
+def seed_state(state: Optional[Dict[str, Any]], profile: Optional[UserProfile]) -> Dict[str, Any]:
+    """Initial state for a new session: the given state overlaid with the user's stored profile."""
+    seeded = dict(state or {})
+    if profile is not None:
+        seeded.update(profile.fields)
+    return seeded
+
+
+_profile_store: Optional[ProfileStore] = None
+_profile_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """Return the process-wide profile store for the configured backend."""
+    global _profile_store
+    with _profile_store_lock:
+        if _profile_store is None:
+            _profile_store = ProfileStore(PROFILE_DB_PATH if PROFILE_STORE_BACKEND == "sqlite" else None)
+    return _profile_store
@@ -0,0 +1,135 @@
+# services/recorder.py
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from google.adk.events import Event
+
+from services.admission import admission_waited
+from utils.log import get_logger
+from config.settings import RECORD_FILE
+
+log = get_logger(__name__)
+
+RECORDING_FORMAT_VERSION = 1
+
+
+class TurnRecorder:
+    """
+    Records the event stream of each model turn as one line of an append-only JSONL file.
+
+    Args:
+        path: The JSONL file turns are appended to.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="turn-recorder")
+        self.turns = 0
+        self.events = 0
+        self.bytes = 0
+
+    async def record(self, events: AsyncIterator[Event], *, user_id: str, session_id: str, prompt: str,
+                     streaming: bool) -> AsyncIterator[Event]:
+        """
+        Pass events through unchanged while recording them.
+
+        Args:
+            events: The runner.run_async event stream of one turn.
+            user_id: The ADK user ID owning the session.
+            session_id: The ADK session ID the turn ran on.
+            prompt: The user's message text.
+            streaming: Whether the turn ran in SSE streaming mode.
+
+        Yields:
+            The events of the stream, as they arrive.
+        """
+        recorded = []
+        waited = [0.0]
+        admission_waited.set(waited)  # Set before the first event, so tasks the runner spawns share it
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            async with aclosing(events) as stream:
+                async for event in stream:
+                    recorded.append({
+                        "t": round(time.perf_counter() - start - waited[0], 4),
+                        "event": event.model_dump(mode="json", exclude_none=True, exclude_defaults=True),
+                    })
+                    yield event
+        finally:
+            self._writer.submit(self._append, {
+                "v": RECORDING_FORMAT_VERSION,
+                "ts": started_at,
+                "user_id": user_id,
+                "session_id": session_id,
+                "prompt": prompt,
+                "streaming": streaming,
+                "waited": round(waited[0], 4),
+                "events": recorded,
+            })
+
+    def _append(self, turn: Dict[str, Any]) -> None:
+        """Append one turn to the file; runs on the writer thread."""
+        line = json.dumps(turn, separators=(",", ":"), ensure_ascii=False) + "\n"
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            log.exception("recorder.write_failed", "Could not append to the recording", path=self.path)
+            return
+        with self._lock:
+            self.turns += 1
+            self.events += len(turn["events"])
+            self.bytes += len(line)
+
+    def flush(self) -> None:
+        """Block until every turn recorded so far is in the file."""
+        self._writer.submit(lambda: None).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Turns, events and bytes recorded so far."""
+        with self._lock:
+            return {"path": self.path, "turns": self.turns, "events": self.events, "bytes": self.bytes}
+
+
+_recorder: Optional[TurnRecorder] = TurnRecorder(RECORD_FILE) if RECORD_FILE else None
+
+
+def get_turn_recorder() -> Optional[TurnRecorder]:
+    """Return the process-wide turn recorder, or None when ADK_RECORD_FILE is not set."""
+    return _recorder
+
+
+def record_events(events: AsyncIterator[Event], **turn: Any) -> AsyncIterator[Event]:
+    """Wrap a turn's event stream in the recorder when recording is on; otherwise return it unchanged."""
+    if _recorder is None:
+        return events
+    return _recorder.record(events, **turn)
+
+
+def read_recordings(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read recorded turns in file order.
+
+    A truncated last line (the process died mid-write) is skipped.
+
+    Args:
+        path: The recording file.
+
+    Yields:
+        One dictionary per recorded turn, as written by TurnRecorder.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                log.warning("recorder.bad_line", "Skipping unreadable recording line", path=path, line=line_number)
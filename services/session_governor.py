@@ -0,0 +1,186 @@
+# services/session_governor.py
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+
+from services.chat_history import is_chat_message
+from services.event_loop import get_event_loop
+from services.session_manager import SessionPool
+from services.turn_coordinator import get_turn_coordinator
+from services.sqlite_session_service import SqliteSessionService
+from utils.log import get_logger
+from config.settings import (
+    APP_NAME_FOR_ADK,
+    HISTORY_DROPPED_STATE_KEY,
+    SESSION_MAX_EVENTS,
+    SESSION_SWEEP_INTERVAL_SECONDS,
+    SESSION_MEMORY_BYTES_PER_JSON_BYTE,
+)
+
+log = get_logger(__name__)
+
+
+def estimate_event_bytes(event: Event) -> int:
+    """Approximate memory held by an event: its JSON size scaled up to Python object overhead."""
+    return len(event.model_dump_json(exclude_none=True)) * SESSION_MEMORY_BYTES_PER_JSON_BYTE
+
+
+def event_cap_start(events: List[Event], max_events: int) -> int:
+    """
+    Index of the first event to keep so that at most max_events remain.
+
+    The kept window starts at a user message, so a turn's function calls and
+    responses are never separated. Returns 0 (keep everything) if the cap is
+    off, not reached, or no user message falls inside the window.
+    """
+    if not max_events or len(events) <= max_events:
+        return 0
+    for index in range(len(events) - max_events, len(events)):
+        if events[index].author == "user":
+            return index
+    return 0
+
+
+async def release_evicted_sessions(session_service: BaseSessionService, evicted: List[Tuple[str, str]]) -> None:
+    """
+    Release the memory held by sessions evicted from the pool.
+
+    Durable services only drop their cached copy (the session reloads from disk
+    on next access); the in-memory service has nowhere else to keep it, so the
+    session is deleted.
+    """
+    if isinstance(session_service, SqliteSessionService):
+        for user_id, session_id in evicted:
+            session_service.unload_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+        log.info("session.unloaded", "Unloaded evicted sessions from the cache", count=len(evicted))
+        return
+
+    try:
+        for user_id, session_id in evicted:
+            await session_service.delete_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+        log.info("session.evicted", "Deleted evicted sessions", count=len(evicted))
+    except Exception:
+        log.exception("session.evict_failed", "Failed to delete evicted ADK sessions")
+
+
+class SessionGovernor:
+    """
+    Bounds the memory a SessionService spends on sessions.
+
+    A sweeper task on the event loop runs every SESSION_SWEEP_INTERVAL_SECONDS
+    and, for each session in the pool:
+    - measures its events (each event once, when first seen) and reports the
+      estimated bytes and event count to the pool;
+    - with the in-memory backend, drops its oldest turns once it holds more
+      than max_events events. The number of chat messages dropped is added
+      to the session's HISTORY_DROPPED_STATE_KEY, so the UI can say that
+      earlier history is gone rather than silently showing less of it. The
+      sqlite backend keeps the full history on disk, so the cap does not
+      apply there; its cached copies are unloaded rather than trimmed.
+    Then the pool evicts sessions idle past their TTL and, coldest first,
+    sessions over the memory budget, and they are released from the service.
+    Sessions with a turn running or queued count as just used, so a sweep
+    never evicts a session out from under its turn.
+    """
+
+    def __init__(self, session_service: BaseSessionService, session_pool: SessionPool,
+                 max_events: int = SESSION_MAX_EVENTS, sweep_interval_seconds: float = SESSION_SWEEP_INTERVAL_SECONDS):
+        self.session_service = session_service
+        self.session_pool = session_pool
+        self.max_events = max_events if isinstance(session_service, InMemorySessionService) else 0
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._measured: Dict[str, Tuple[int, int]] = {}  # session_id -> (events measured, their bytes)
+        self._task = None
+        self.sweeps = 0
+        self.events_trimmed = 0
+        self.last_sweep_seconds = 0.0
+
+    def start(self) -> None:
+        """Start the sweeper on the running loop, or on the shared background loop when called off-loop."""
+        if self._task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._task = get_event_loop().submit(self._sweep_forever())  # Called from a Streamlit script thread
+            return
+        self._task = loop.create_task(self._sweep_forever())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await self.sweep()
+            except Exception:
+                log.exception("session_governor.sweep_failed", "Session sweep failed")
+
+    async def sweep(self) -> List[Tuple[str, str]]:
+        """
+        Measure and cap every pooled session, then evict and release idle and over-budget ones.
+
+        Returns:
+            The (user_id, session_id) pairs that were evicted.
+        """
+        start = time.perf_counter()
+        self.session_pool.mark_active(get_turn_coordinator().busy_sessions())
+        measured: Dict[str, Tuple[int, int]] = {}
+        trimmed = 0
+        for user_id, session_id in self.session_pool.sessions():
+            stored = self._stored_session(user_id, session_id)
+            if stored is None:
+                continue
+            cut = event_cap_start(stored.events, self.max_events)
+            if cut:
+                dropped = sum(1 for event in stored.events[:cut] if is_chat_message(event))
+                stored.state[HISTORY_DROPPED_STATE_KEY] = stored.state.get(HISTORY_DROPPED_STATE_KEY, 0) + dropped
+                del stored.events[:cut]
+                self._measured.pop(session_id, None)
+                trimmed += cut
+            measured[session_id] = self._measure(session_id, stored.events)
+            self.session_pool.record_usage(session_id, measured[session_id][1], len(stored.events))
+        self._measured = measured  # Forget sessions that left the pool
+
+        evicted = self.session_pool.sweep(busy=get_turn_coordinator().busy_sessions())
+        if evicted:
+            await release_evicted_sessions(self.session_service, evicted)
+        self.sweeps += 1
+        self.events_trimmed += trimmed
+        self.last_sweep_seconds = time.perf_counter() - start
+        if evicted or trimmed:
+            log.info("session_governor.swept", evicted=len(evicted), events_trimmed=trimmed,
+                     duration_ms=round(self.last_sweep_seconds * 1000, 2))
+        return evicted
+
+    def _stored_session(self, user_id: str, session_id: str) -> Optional[Session]:
+        """The service's own copy of a session (not a deep copy), or None if it holds none in memory."""
+        service = self.session_service
+        if isinstance(service, SqliteSessionService):
+            return service.cached_session(app_name=APP_NAME_FOR_ADK, user_id=user_id, session_id=session_id)
+        if isinstance(service, InMemorySessionService):
+            return service.sessions.get(APP_NAME_FOR_ADK, {}).get(user_id, {}).get(session_id)
+        return None
+
+    def _measure(self, session_id: str, events: List[Event]) -> Tuple[int, int]:
+        counted, size = self._measured.get(session_id, (0, 0))
+        if counted > len(events):  # Recreated or trimmed since the last sweep
+            counted, size = 0, 0
+        size += sum(estimate_event_bytes(event) for event in events[counted:])
+        return len(events), size
+
+    def stats(self) -> Dict[str, Any]:
+        """Sweeps run, events dropped by the per-session cap and the last sweep's duration."""
+        return {
+            "sweeps": self.sweeps,
+            "events_trimmed": self.events_trimmed,
+            "max_events": self.max_events,
+            "last_sweep_ms": self.last_sweep_seconds * 1000,
+        }
@@ -0,0 +1,187 @@
+# services/session_manager.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import (
+    SESSION_POOL_MAX_SIZE,
+    SESSION_POOL_IDLE_TTL_SECONDS,
+    SESSION_MEMORY_BUDGET_BYTES,
+)
+
+
+class SessionPool:
+    """
+    A bounded LRU pool of active ADK sessions with idle-TTL eviction and a
+    memory budget.
+
+    The pool only tracks which (user_id, session_id) pairs are live and their
+    estimated size (reported by the SessionGovernor); the session data itself
+    stays in the ADK SessionService. Callers are expected to delete evicted
+    sessions from the service so memory is actually freed, and to pass the
+    sessions with a turn running so those are never evicted.
+    """
+
+    def __init__(self, max_size: int = SESSION_POOL_MAX_SIZE, idle_ttl_seconds: float = SESSION_POOL_IDLE_TTL_SECONDS,
+                 memory_budget_bytes: int = SESSION_MEMORY_BUDGET_BYTES):
+        self.max_size = max_size
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.total_events = 0
+        self.hits = 0
+        self.misses = 0
+        self.lru_evictions = 0
+        self.ttl_evictions = 0
+        self.budget_evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._entries
+
+    def touch(self, user_id: str, session_id: str,
+              busy: Iterable[str] = ()) -> Tuple[bool, List[Tuple[str, str]]]:
+        """
+        Mark a session as most recently used, admitting it if it is not pooled.
+
+        Args:
+            user_id: The ADK user ID owning the session.
+            session_id: The ADK session ID.
+            busy: IDs of sessions with a turn running or waiting; they are not evicted.
+
+        Returns:
+            tuple: (whether the session was already pooled,
+                    list of (user_id, session_id) pairs evicted to make room or due to idle TTL)
+        """
+        now = time.monotonic()
+        busy = set(busy)
+        with self._lock:
+            evicted = self._expire_idle(now, busy)
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self.hits += 1
+                entry["last_access"] = now
+                self._entries.move_to_end(session_id)
+                return True, evicted
+
+            self.misses += 1
+            self._entries[session_id] = {"user_id": user_id, "created": now, "last_access": now, "bytes": 0, "events": 0}
+            while len(self._entries) > self.max_size:
+                # Over capacity until a turn finishes if everything else is busy
+                old_session_id = self._coldest(busy | {session_id})
+                if old_session_id is None:
+                    break
+                old_entry = self._pop(old_session_id)
+                self.lru_evictions += 1
+                evicted.append((old_entry["user_id"], old_session_id))
+            evicted.extend(self._enforce_budget(busy))
+            return False, evicted
+
+    def sweep(self, busy: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """Evict every session idle longer than the TTL, then the coldest ones while over the memory budget."""
+        busy = set(busy)
+        with self._lock:
+            evicted = self._expire_idle(time.monotonic(), busy)
+            evicted.extend(self._enforce_budget(busy))
+            return evicted
+
+    def mark_active(self, session_ids: Iterable[str]) -> None:
+        """Mark pooled sessions as just used (e.g. while a turn runs on them) without counting a lookup."""
+        now = time.monotonic()
+        with self._lock:
+            for session_id in session_ids:
+                entry = self._entries.get(session_id)
+                if entry is not None:
+                    entry["last_access"] = now
+                    self._entries.move_to_end(session_id)
+
+    def sessions(self) -> List[Tuple[str, str]]:
+        """(user_id, session_id) of every pooled session, coldest first."""
+        with self._lock:
+            return [(entry["user_id"], session_id) for session_id, entry in self._entries.items()]
+
+    def record_usage(self, session_id: str, size_bytes: int, events: int) -> None:
+        """Set a pooled session's estimated memory and event count."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+            self.total_bytes += size_bytes - entry["bytes"]
+            self.total_events += events - entry["events"]
+            entry["bytes"] = size_bytes
+            entry["events"] = events
+
+    def discard(self, session_id: str) -> None:
+        """Remove a session from the pool without counting it as an eviction."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._forget_usage(entry)
+
+    def _coldest(self, keep: set) -> Optional[str]:
+        return next((session_id for session_id in self._entries if session_id not in keep), None)
+
+    def _pop(self, session_id: str) -> Dict[str, Any]:
+        entry = self._entries.pop(session_id)
+        self._forget_usage(entry)
+        return entry
+
+    def _forget_usage(self, entry: Dict[str, Any]) -> None:
+        self.total_bytes -= entry["bytes"]
+        self.total_events -= entry["events"]
+
+    def _enforce_budget(self, busy: set) -> List[Tuple[str, str]]:
+        evicted = []
+        if not self.memory_budget_bytes or not self._entries:
+            return evicted
+        # Coldest first; the most recently used session is never evicted for the budget
+        keep = busy | {next(reversed(self._entries))}
+        while self.total_bytes > self.memory_budget_bytes:
+            session_id = self._coldest(keep)
+            if session_id is None:
+                break
+            entry = self._pop(session_id)
+            self.budget_evictions += 1
+            evicted.append((entry["user_id"], session_id))
+        return evicted
+
+    def _expire_idle(self, now: float, busy: set) -> List[Tuple[str, str]]:
+        evicted = []
+        if not self.idle_ttl_seconds:
+            return evicted
+        # Entries are kept in access order, so the idle ones are at the front
+        idle = []
+        for session_id, entry in self._entries.items():
+            if now - entry["last_access"] <= self.idle_ttl_seconds:
+                break
+            if session_id not in busy:
+                idle.append(session_id)
+        for session_id in idle:
+            entry = self._pop(session_id)
+            self.ttl_evictions += 1
+            evicted.append((entry["user_id"], session_id))
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy and eviction counters for display or export."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "occupancy": len(self._entries),
+                "capacity": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "lru_evictions": self.lru_evictions,
+                "ttl_evictions": self.ttl_evictions,
+                "budget_evictions": self.budget_evictions,
+                "bytes": self.total_bytes,
+                "budget_bytes": self.memory_budget_bytes,
+                "events": self.total_events,
+            }
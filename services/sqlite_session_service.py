@@ -0,0 +1,561 @@
+# services/sqlite_session_service.py
+
+import asyncio
+import itertools
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from google.adk.sessions.state import State
+
+from utils.log import get_logger
+from config.settings import (
+    SESSION_DB_PATH,
+    SESSION_DB_BATCH_SIZE,
+    SESSION_DB_FLUSH_INTERVAL_SECONDS,
+)
+
+log = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_session
+    ON events (app_name, user_id, session_id, timestamp);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+# Sentinel placed on the write queue to stop the writer thread
+_STOP = object()
+
+# Write ops that belong to one session; their key is (app_name, user_id, session_id) = op[1:4]
+_SESSION_OPS = ("create", "append", "delete")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _split_state(state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state dict into (app, user, session) scoped parts, dropping temp keys."""
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    A durable ADK SessionService backed by a local SQLite database, with write-behind batching.
+
+    Args:
+        db_path: The SQLite database file.
+        batch_size: Maximum queued writes committed in one transaction.
+        flush_interval_seconds: How long the writer collects a batch before committing it.
+    """
+
+    def __init__(self, db_path: str = SESSION_DB_PATH, batch_size: int = SESSION_DB_BATCH_SIZE,
+                 flush_interval_seconds: float = SESSION_DB_FLUSH_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+
+        # Canonical in-memory copies, keyed by (app_name, user_id, session_id)
+        self._sessions: Dict[Tuple[str, str, str], Session] = {}
+        self._app_states: Dict[str, Dict[str, Any]] = {}
+        self._user_states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._versions: Dict[Tuple[str, str, str], int] = {}  # Version of each cached session after its local writes
+        self._pending: Dict[Tuple[str, str, str], int] = {}  # Queued, uncommitted writes per session
+        self._stale: set = set()  # Sessions whose cached copy lost a write conflict
+        self._copies: Dict[Tuple[str, str, str], int] = {}  # Which load of each session is cached; writes carry it
+        self._rejected: Dict[Tuple[str, str, str], int] = {}  # Cached copy per session whose writes are refused
+        self._copy_ids = itertools.count(1)
+        self._cache_lock = threading.RLock()
+        self._pending_changed = threading.Condition(self._cache_lock)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            if "version" not in {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}:
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")  # Databases from before versioning
+        self._reader = self._connect(check_same_thread=False)
+        self._reader_lock = threading.Lock()
+
+        self._write_queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="adk-sqlite-writer", daemon=True)
+        self._writer.start()
+        self.batches_written = 0
+        self.ops_written = 0
+        self.write_conflicts = 0
+        self.reloads = 0
+        log.info("sqlite_sessions.opened", db_path=db_path)
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across application crashes in WAL mode; only an OS
+        # crash can lose the last commits
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # ------------------------------------------------------------------
+    # BaseSessionService interface
+    # ------------------------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id else str(uuid.uuid4())
+        key = (app_name, user_id, session_id)
+        if await self._get_canonical(key) is not None:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        await self._ensure_scoped_state(app_name, user_id)
+
+        app_delta, user_delta, session_state = _split_state(state or {})
+        now = time.time()
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=session_state, last_update_time=now)
+        with self._cache_lock:
+            self._sessions[key] = session
+            self._versions[key] = 1
+            self._copies[key] = next(self._copy_ids)
+            if app_delta:
+                self._app_states.setdefault(app_name, {}).update(app_delta)
+                self._enqueue(("app_state", app_name, _dumps(self._app_states[app_name])))
+            if user_delta:
+                self._user_states.setdefault((app_name, user_id), {}).update(user_delta)
+                self._enqueue(("user_state", app_name, user_id, _dumps(self._user_states[(app_name, user_id)])))
+            self._enqueue(("create", app_name, user_id, session_id, _dumps(session_state), now, now))
+            return self._merged_copy(session)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        session = await self._get_canonical((app_name, user_id, session_id))
+        if session is None:
+            return None
+        with self._cache_lock:
+            events = session.events
+            if config:
+                if config.num_recent_events is not None:
+                    events = events[-config.num_recent_events:] if config.num_recent_events else []
+                if config.after_timestamp:
+                    events = [e for e in events if e.timestamp >= config.after_timestamp]
+            return self._merged_copy(session, events)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        def _query():
+            sql = "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ?"
+            params: List[Any] = [app_name]
+            if user_id is not None:
+                sql += " AND user_id = ?"
+                params.append(user_id)
+            with self._reader_lock:
+                return self._reader.execute(sql, params).fetchall()
+
+        await self.flush()  # Pending creations and deletions must be on disk first
+        rows = await asyncio.to_thread(_query)
+        found: Dict[Tuple[str, str], Session] = {}
+        for row_user_id, row_id, state_json, update_time in rows:
+            found[(row_user_id, row_id)] = Session(
+                app_name=app_name, user_id=row_user_id, id=row_id,
+                state=json.loads(state_json), last_update_time=update_time,
+            )
+        # Cached sessions may have pending writes that are not on disk yet
+        with self._cache_lock:
+            for (s_app, s_user, s_id), session in self._sessions.items():
+                if s_app == app_name and (user_id is None or s_user == user_id):
+                    found[(s_user, s_id)] = session.model_copy(update={"events": [], "state": dict(session.state)})
+        sessions = sorted(found.values(), key=lambda s: (s.last_update_time, s.user_id, s.id))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._cache_lock:
+            self._forget(key)
+            self._enqueue(("delete", app_name, user_id, session_id))
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        await self._ensure_scoped_state(app_name, user_id)
+        with self._cache_lock:
+            return dict(self._user_states.get((app_name, user_id), {}))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+
+        key = (session.app_name, session.user_id, session.id)
+        canonical = await self._get_canonical(key)
+        if canonical is None:
+            log.warning("sqlite_sessions.unknown_session", "append_event for unknown session; event not persisted",
+                        session_id=session.id)
+            return event
+
+        with self._cache_lock:
+            canonical.events.append(event)
+            canonical.last_update_time = event.timestamp
+            state_delta = event.actions.state_delta if event.actions else None
+            session_delta: Dict[str, Any] = {}
+            if state_delta:
+                app_delta, user_delta, session_delta = _split_state(state_delta)
+                if app_delta:
+                    self._app_states.setdefault(session.app_name, {}).update(app_delta)
+                    self._enqueue(("app_state", session.app_name, _dumps(self._app_states[session.app_name])))
+                if user_delta:
+                    user_key = (session.app_name, session.user_id)
+                    self._user_states.setdefault(user_key, {}).update(user_delta)
+                    self._enqueue(("user_state", session.app_name, session.user_id, _dumps(self._user_states[user_key])))
+                canonical.state.update(session_delta)
+            base_version = self._versions.get(key, 0)
+            self._versions[key] = base_version + 1
+            self._enqueue(("append", session.app_name, session.user_id, session.id, _dumps(session_delta),
+                           canonical.last_update_time, base_version, self._copies.get(key, 0), event.id,
+                           event.timestamp, event.model_dump_json(exclude_none=True)))
+        return event
+
+    async def flush(self) -> None:
+        """Wait until every write queued before this call has been committed to disk."""
+        written = threading.Event()
+        self._enqueue(("barrier", written))
+        await asyncio.to_thread(written.wait)
+
+    async def _wait_for_pending(self, key: Tuple[str, str, str]) -> None:
+        """Wait for the queued writes of one session, so a disk read cannot overtake them."""
+        def _wait():
+            with self._pending_changed:
+                self._pending_changed.wait_for(lambda: not self._pending.get(key))
+
+        with self._cache_lock:
+            pending = self._pending.get(key)
+        if pending:
+            await asyncio.to_thread(_wait)
+
+    # ------------------------------------------------------------------
+    # Cache management
+    # ------------------------------------------------------------------
+
+    def unload_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        """Drop a session from the in-process cache; it stays on disk and reloads on next access."""
+        with self._cache_lock:
+            self._forget((app_name, user_id, session_id))
+
+    def cached_session(self, *, app_name: str, user_id: str, session_id: str) -> Optional[Session]:
+        """The cached canonical copy of a session (not a copy; do not modify it), or None if not loaded."""
+        with self._cache_lock:
+            return self._sessions.get((app_name, user_id, session_id))
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if self._writer.is_alive():
+            self._write_queue.put(_STOP)
+            self._writer.join()
+        with self._reader_lock:
+            self._reader.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache occupancy and write-behind counters for display or export."""
+        return {
+            "cached_sessions": len(self._sessions),
+            "pending_writes": self._write_queue.qsize(),
+            "batches_written": self.batches_written,
+            "ops_written": self.ops_written,
+            "write_conflicts": self.write_conflicts,
+            "reloads": self.reloads,
+        }
+
+    async def _get_canonical(self, key: Tuple[str, str, str]) -> Optional[Session]:
+        """
+        The cached copy of a session, revalidated against the database.
+
+        With writes of its own in flight the cached copy is current as far as
+        this process knows (a conflicting write from elsewhere is caught when
+        they commit), so it is served as is. Otherwise its version is checked
+        against the row, and the session is reloaded if it changed on disk or
+        lost a write conflict.
+        """
+        with self._cache_lock:
+            session = self._sessions.get(key)
+            version = self._versions.get(key)
+            pending = self._pending.get(key)
+            stale = key in self._stale
+        if session is not None and not stale:
+            if pending:
+                return session
+            disk_version = await asyncio.to_thread(self._read_version, *key)
+            with self._cache_lock:
+                if self._sessions.get(key) is not session or self._pending.get(key):
+                    return self._sessions.get(key)  # Changed by another coroutine while we were reading
+                if disk_version == version:
+                    return session
+                self._forget(key)
+            if disk_version is None:
+                return None  # Deleted by another process
+            self.reloads += 1
+            log.debug("sqlite_sessions.reloading", session_id=key[2], cached_version=version, disk_version=disk_version)
+        elif stale:
+            with self._cache_lock:
+                self._forget(key)
+            self.reloads += 1
+
+        await self._wait_for_pending(key)
+        loaded = await asyncio.to_thread(self._load_session, *key)
+        if loaded is None:
+            return None
+        session, version = loaded
+        await self._ensure_scoped_state(key[0], key[1])
+        with self._cache_lock:
+            # Another coroutine may have loaded it while we were reading
+            if key not in self._sessions:
+                self._sessions[key] = session
+                self._versions[key] = version
+                self._copies[key] = next(self._copy_ids)
+                self._stale.discard(key)
+            return self._sessions[key]
+
+    def _forget(self, key: Tuple[str, str, str]) -> None:
+        """Drop a session's cached copy (call with the cache lock held)."""
+        self._sessions.pop(key, None)
+        self._versions.pop(key, None)
+        self._copies.pop(key, None)
+        self._stale.discard(key)
+
+    def _read_version(self, app_name: str, user_id: str, session_id: str) -> Optional[int]:
+        with self._reader_lock:
+            row = self._reader.execute(
+                "SELECT version FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _load_session(self, app_name: str, user_id: str, session_id: str) -> Optional[Tuple[Session, int]]:
+        with self._reader_lock:
+            row = self._reader.execute(
+                "SELECT state, update_time, version FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            event_rows = self._reader.execute(
+                "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY timestamp, rowid",
+                (app_name, user_id, session_id),
+            ).fetchall()
+        events = [Event.model_validate_json(data) for (data,) in event_rows]
+        log.debug("sqlite_sessions.loaded", session_id=session_id, events=len(events))
+        return Session(app_name=app_name, user_id=user_id, id=session_id,
+                       state=json.loads(row[0]), events=events, last_update_time=row[1]), row[2]
+
+    async def _ensure_scoped_state(self, app_name: str, user_id: str) -> None:
+        """Lazily load app- and user-scoped state into the cache."""
+        with self._cache_lock:
+            need_app = app_name not in self._app_states
+            need_user = (app_name, user_id) not in self._user_states
+        if not need_app and not need_user:
+            return
+
+        def _query():
+            with self._reader_lock:
+                app_row = self._reader.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+                user_row = self._reader.execute(
+                    "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+                ).fetchone()
+            return app_row, user_row
+
+        app_row, user_row = await asyncio.to_thread(_query)
+        with self._cache_lock:
+            if need_app:
+                self._app_states.setdefault(app_name, json.loads(app_row[0]) if app_row else {})
+            if need_user:
+                self._user_states.setdefault((app_name, user_id), json.loads(user_row[0]) if user_row else {})
+
+    def _merged_copy(self, session: Session, events: Optional[List[Event]] = None) -> Session:
+        """
+        Deep-copy a canonical session and merge app/user state into its state.
+
+        Args:
+            session: The canonical session.
+            events: The events to copy, if not all of them (only these are copied).
+        """
+        copied = session.model_copy(update={"events": []}).model_copy(deep=True)
+        copied.events = [event.model_copy(deep=True) for event in (session.events if events is None else events)]
+        for key, value in self._app_states.get(session.app_name, {}).items():
+            copied.state[State.APP_PREFIX + key] = value
+        for key, value in self._user_states.get((session.app_name, session.user_id), {}).items():
+            copied.state[State.USER_PREFIX + key] = value
+        return copied
+
+    # ------------------------------------------------------------------
+    # Write-behind queue
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, op: Tuple) -> None:
+        if op[0] in _SESSION_OPS:
+            key = op[1:4]
+            with self._cache_lock:
+                self._pending[key] = self._pending.get(key, 0) + 1
+        self._write_queue.put(op)
+
+    def _written(self, ops: List[Tuple]) -> None:
+        """Mark ops as committed (or failed) and wake readers waiting on their sessions."""
+        with self._pending_changed:
+            for op in ops:
+                if op[0] in _SESSION_OPS:
+                    key = op[1:4]
+                    remaining = self._pending.get(key, 0) - 1
+                    if remaining > 0:
+                        self._pending[key] = remaining
+                    else:
+                        self._pending.pop(key, None)
+                        if self._rejected.get(key) != self._copies.get(key):
+                            self._rejected.pop(key, None)  # No writes from the refused copy are left
+                elif op[0] == "barrier":
+                    op[1].set()
+            self._pending_changed.notify_all()
+
+    def _writer_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._write_queue.get()]
+                deadline = time.monotonic() + self.flush_interval_seconds
+                while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._write_queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                ops = [op for op in batch if op is not _STOP]
+                try:
+                    self._write_batch(conn, ops)
+                except Exception:
+                    log.exception("sqlite_sessions.write_failed", "Write-behind batch of %d ops failed", len(ops))
+                finally:
+                    self._written(ops)
+                if len(ops) != len(batch):
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, ops: List[Tuple]) -> None:
+        ops = [op for op in ops if op[0] != "barrier"]
+        if not ops:
+            return
+        conflicts = []
+        with self._cache_lock:
+            rejected = dict(self._rejected)
+        with conn:
+            for op in ops:
+                kind = op[0]
+                if kind == "create":
+                    created = conn.execute(
+                        "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time, version) "
+                        "VALUES (?, ?, ?, ?, ?, ?, 1) ON CONFLICT (app_name, user_id, id) DO NOTHING",
+                        op[1:],
+                    )
+                    if not created.rowcount:
+                        conflicts.append(op)
+                elif kind == "append":
+                    (app_name, user_id, session_id, state_delta, update_time, base_version, copy_id,
+                     event_id, timestamp, data) = op[1:]
+                    key = (app_name, user_id, session_id)
+                    if rejected.get(key) == copy_id:
+                        conflicts.append(op)  # The copy it came from already lost a conflict
+                        continue
+                    # Only applies on top of the version the cached copy was based on
+                    updated = conn.execute(
+                        "UPDATE sessions SET update_time = ?, version = version + 1 "
+                        "WHERE app_name = ? AND user_id = ? AND id = ? AND version = ?",
+                        (update_time, app_name, user_id, session_id, base_version),
+                    )
+                    if not updated.rowcount:
+                        rejected[key] = copy_id
+                        conflicts.append(op)
+                        continue
+                    delta = json.loads(state_delta)
+                    if delta:
+                        row = conn.execute("SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                                           key).fetchone()
+                        conn.execute("UPDATE sessions SET state = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                                     (_dumps({**json.loads(row[0]), **delta}), *key))
+                    conn.execute(
+                        "INSERT OR REPLACE INTO events (app_name, user_id, session_id, id, timestamp, data) VALUES (?, ?, ?, ?, ?, ?)",
+                        (app_name, user_id, session_id, event_id, timestamp, data),
+                    )
+                elif kind == "app_state":
+                    conn.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", op[1:])
+                elif kind == "user_state":
+                    conn.execute("INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)", op[1:])
+                elif kind == "delete":
+                    conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", op[1:])
+                    conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", op[1:])
+        self.batches_written += 1
+        self.ops_written += len(ops)
+        if conflicts:
+            with self._cache_lock:
+                for op in conflicts:
+                    key = op[1:4]
+                    if op[0] == "append":
+                        self._rejected[key] = op[7]
+                        if self._copies.get(key) != op[7]:
+                            continue  # Already reloaded since
+                    self._stale.add(key)
+            self.write_conflicts += len(conflicts)
+            for op in conflicts:
+                log.warning("sqlite_sessions.write_conflict",
+                            "Another process changed the session first; the stale write was rejected",
+                            session_id=op[3], op=op[0])
@@ -0,0 +1,184 @@
+# services/turn_coordinator.py
+
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.metrics import get_metrics
+from utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class _SessionTurns:
+    """Per-session bookkeeping: the turn lock, turns holding or waiting for it, and in-flight prompts."""
+
+    __slots__ = ("lock", "pending", "in_flight")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+
+class TurnCoordinator:
+    """
+    Orders the turns of each session and coalesces duplicate submits.
+
+    - Turns on the same session run one at a time, in arrival order, so
+      overlapping turns (double submits, reruns, two tabs on one session) never
+      race on session state or interleave their events.
+    - A prompt identical to one still in flight (running or queued) on the
+      same session shares that turn's reply instead of running the agent (and
+      the model) again. Replies are not kept once a turn finishes, so a prompt
+      repeated afterwards, or retried after an error reply, runs as a turn of
+      its own and is recorded in the session.
+
+    Per-session entries exist only while a turn is pending, so memory is
+    bounded by the number of active sessions.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, _SessionTurns] = {}
+        self._turns = 0
+        self._coalesced = 0
+        self._max_queue_depth = 0
+
+    async def run(self, session_id: str, text: str, turn: Callable[[], Awaitable[str]]) -> str:
+        """
+        Run one turn through the session's queue, or share the reply of an identical one.
+
+        Args:
+            session_id: The ADK session the turn belongs to.
+            text: The user's prompt, used to detect duplicates.
+            turn: Zero-argument coroutine function that executes the turn.
+
+        Returns:
+            The turn's reply.
+        """
+        key = text.strip()
+        shared = self._shared_reply(session_id, key)
+        if shared is not None:
+            return await shared
+
+        entry, future = self._enqueue(session_id, key)
+        try:
+            with get_metrics().span("adk_turn_queue_wait_seconds"):
+                await entry.lock.acquire()
+            try:
+                reply = await turn()
+            finally:
+                entry.lock.release()
+        except BaseException as e:
+            _fail(future, e)
+            raise
+        else:
+            self._complete(future, reply)
+            return reply
+        finally:
+            self._dequeue(session_id, key, entry, future)
+
+    async def stream(self, session_id: str, text: str, turn: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of run. The turn yields chunk dicts ending with a
+        'final' chunk; a coalesced duplicate yields only that final chunk.
+        """
+        key = text.strip()
+        shared = self._shared_reply(session_id, key)
+        if shared is not None:
+            yield {"type": "final", "text": await shared}
+            return
+
+        entry, future = self._enqueue(session_id, key)
+        reply = None
+        try:
+            with get_metrics().span("adk_turn_queue_wait_seconds"):
+                await entry.lock.acquire()
+            try:
+                async with aclosing(turn()) as chunks:
+                    async for chunk in chunks:
+                        if chunk["type"] == "final":
+                            reply = chunk["text"]
+                        yield chunk
+            finally:
+                entry.lock.release()
+        except BaseException as e:
+            _fail(future, e)
+            raise
+        else:
+            self._complete(future, reply or "")
+        finally:
+            if not future.done():
+                # The consumer stopped early; duplicates waiting on this turn fail rather than hang
+                _fail(future, None)
+            self._dequeue(session_id, key, entry, future)
+
+    def _shared_reply(self, session_id: str, key: str) -> Optional[Awaitable[str]]:
+        """An awaitable for the reply of an identical in-flight turn, if there is one."""
+        entry = self._sessions.get(session_id)
+        future = entry.in_flight.get(key) if entry is not None else None
+        if future is None:
+            return None
+        self._coalesced += 1
+        log.info("turn_queue.coalesced", "Coalesced duplicate prompt", session_id=session_id)
+        return asyncio.shield(future)
+
+    def _enqueue(self, session_id: str, key: str) -> Tuple[_SessionTurns, asyncio.Future]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = _SessionTurns()
+        entry.pending += 1
+        future = asyncio.get_running_loop().create_future()
+        entry.in_flight[key] = future
+        self._turns += 1
+        self._max_queue_depth = max(self._max_queue_depth, entry.pending - 1)
+        if entry.pending > 1:
+            log.info("turn_queue.queued", "Session busy, turn queued", session_id=session_id, ahead=entry.pending - 1)
+        return entry, future
+
+    def _complete(self, future: asyncio.Future, reply: str) -> None:
+        if not future.done():
+            future.set_result(reply)
+
+    def _dequeue(self, session_id: str, key: str, entry: _SessionTurns, future: asyncio.Future) -> None:
+        entry.pending -= 1
+        if entry.in_flight.get(key) is future:
+            del entry.in_flight[key]
+        if entry.pending == 0:
+            self._sessions.pop(session_id, None)
+
+    def busy_sessions(self) -> List[str]:
+        """IDs of the sessions with a turn running or waiting."""
+        return list(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth plus cumulative turn and coalescing counters."""
+        running = sum(1 for entry in self._sessions.values() if entry.lock.locked())
+        queued = sum(entry.pending for entry in self._sessions.values()) - running
+        return {
+            "active_sessions": len(self._sessions),
+            "running": running,
+            "queued": max(queued, 0),
+            "max_queue_depth": self._max_queue_depth,
+            "turns": self._turns,
+            "coalesced": self._coalesced,
+        }
+
+
+def _fail(future: asyncio.Future, error: Optional[BaseException]) -> None:
+    """Propagate a failed or abandoned turn to the duplicates waiting on it."""
+    if future.done():
+        return
+    if not isinstance(error, Exception):  # Cancelled, or the stream's consumer closed it
+        future.cancel()
+    else:
+        future.set_exception(error)
+        future.exception()  # Mark retrieved so an unawaited failure is not logged as lost
+
+
+_coordinator = TurnCoordinator()
+
+
+def get_turn_coordinator() -> TurnCoordinator:
+    """Return the process-wide turn coordinator."""
+    return _coordinator
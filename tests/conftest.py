@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Settings are read at import time: run everything offline, in memory, without writing files into the repo
+os.environ.setdefault("ADK_MODEL", "fake-gemini")
+os.environ.setdefault("ADK_SESSION_BACKEND", "memory")
+os.environ.setdefault("ADK_PROFILE_STORE", "memory")
+os.environ.setdefault("ADK_METRICS_FILE", "")
+os.environ.setdefault("ADK_FAST_PATH", "false")
+os.environ.setdefault("ADK_LOG_LEVEL", "WARNING")
+os.environ.setdefault("FAKE_MODEL_FIRST_TOKEN_LATENCY_SECONDS", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,22 @@
+import asyncio
+
+from google.adk.sessions import InMemorySessionService
+
+from config.settings import APP_NAME_FOR_ADK
+from services.adk_service import create_runner, ensure_session, run_adk_async
+from services.session_manager import SessionPool
+
+
+def test_duplicate_prompts_run_one_turn_against_the_fake_model():
+    runner = create_runner("fake-gemini", fast_model_name=None, session_service=InMemorySessionService())
+
+    async def scenario():
+        await ensure_session(runner, SessionPool(), "u", "s")
+        replies = await asyncio.gather(*(run_adk_async(runner, "s", "My name is Ana", "u") for _ in range(3)))
+        session = await runner.session_service.get_session(app_name=APP_NAME_FOR_ADK, user_id="u", session_id="s")
+        return replies, session
+
+    replies, session = asyncio.run(scenario())
+    assert len(set(replies)) == 1 and "Ana" in replies[0]
+    assert sum(1 for event in session.events if event.author == "user") == 1
+    assert session.state["user_name"] == "Ana"
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from agents.fake_model import FakeLlm
+from services import admission
+from services.admission import AdmissionController, AdmissionRejectedError, admitted
+
+
+def _controller(**overrides):
+    settings = dict(global_rate=0, global_burst=1, user_rate=0, user_burst=1, max_concurrent=1, max_queue=8,
+                    queue_timeout_seconds=1.0)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def _request(text="What can you do?"):
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def _call(model, request=None):
+    return [response async for response in model.generate_content_async(request or _request())]
+
+
+class FlakyLlm(FakeLlm):
+    """FakeLlm whose first `failures` calls fail with the given error."""
+
+    failures: int = 0
+    error_code: int = 429
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise genai_errors.ClientError(self.error_code, {"error": {"code": self.error_code, "message": "fail"}})
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(admission, "backoff_delay", lambda attempt: 0.0)
+
+
+def _flaky(**fields):
+    return FlakyLlm(model="fake-gemini", first_token_latency_seconds=0, tokens_per_second=0, failure_rate=0,
+                    empty_rate=0, **fields)
+
+
+async def _hold(controller, release):
+    async with controller.admit("u"):
+        await release.wait()
+
+
+def test_calls_beyond_the_wait_queue_are_rejected_at_once():
+    controller = _controller(max_queue=1)
+
+    async def scenario():
+        release = asyncio.Event()
+        holders = []
+        for _ in range(2):  # One admitted, then one waiting
+            holders.append(asyncio.create_task(_hold(controller, release)))
+            await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejectedError, match="wait queue full"):
+            async with controller.admit("u"):
+                pass
+        release.set()
+        await asyncio.gather(*holders)
+
+    asyncio.run(scenario())
+    assert controller.stats()["admitted"] == 2
+    assert controller.stats()["rejected"] == 1
+
+
+def test_call_waiting_past_the_queue_timeout_is_rejected():
+    controller = _controller(queue_timeout_seconds=0.05)
+
+    async def scenario():
+        async with controller.admit("u"):
+            with pytest.raises(AdmissionRejectedError, match="free call slot"):
+                async with controller.admit("u"):
+                    pass
+
+    asyncio.run(scenario())
+    assert controller.stats() == {"in_flight": 0, "waiting": 0, "admitted": 1, "rejected": 1, "retries": 0}
+
+
+def test_user_rate_limit_applies_per_user():
+    controller = _controller(user_rate=1, user_burst=1, max_concurrent=4, queue_timeout_seconds=0.1)
+
+    async def scenario():
+        async with controller.admit("ana"):
+            pass
+        with pytest.raises(AdmissionRejectedError, match="rate limit"):
+            async with controller.admit("ana"):
+                pass
+        async with controller.admit("bob"):
+            pass
+
+    asyncio.run(scenario())
+    assert controller.stats()["admitted"] == 2
+
+
+def test_rejected_call_ends_with_an_error_response():
+    controller = _controller(max_queue=0)
+
+    responses = asyncio.run(_call(admitted(_flaky(), controller)))
+
+    assert [response.error_code for response in responses] == ["AdmissionRejectedError"]
+
+
+def test_quota_errors_are_retried_until_the_call_succeeds():
+    controller = _controller()
+    model = _flaky(failures=2)
+
+    responses = asyncio.run(_call(admitted(model, controller)))
+
+    assert model.calls == 3
+    assert responses[-1].content.parts[0].text
+    assert controller.stats()["retries"] == 2
+
+
+def test_retries_stop_after_max_attempts():
+    controller = _controller()
+    model = _flaky(failures=10)
+
+    with pytest.raises(genai_errors.ClientError):
+        asyncio.run(_call(admitted(model, controller)))
+
+    assert model.calls == admission.MODEL_RETRY_MAX_ATTEMPTS
+
+
+def test_client_errors_are_not_retried():
+    controller = _controller()
+    model = _flaky(failures=1, error_code=400)
+
+    with pytest.raises(genai_errors.ClientError):
+        asyncio.run(_call(admitted(model, controller)))
+
+    assert model.calls == 1
+    assert controller.stats()["retries"] == 0
+
+
+def test_cancelling_a_waiting_call_frees_its_queue_place():
+    controller = _controller()
+
+    async def scenario():
+        async with controller.admit("u"):
+            waiter = asyncio.create_task(_call(admitted(_flaky(), controller)))
+            await asyncio.sleep(0.01)
+            assert controller.stats()["waiting"] == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["waiting"] == 0 and stats["in_flight"] == 0 and stats["admitted"] == 1
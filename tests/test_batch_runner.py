@@ -0,0 +1,14 @@
+import asyncio
+
+from batch.runner import iter_items
+
+
+def test_lines_that_are_not_json_objects_are_skipped(tmp_path):
+    input_path = tmp_path / "prompts.jsonl"
+    input_path.write_text('[1, 2]\n"hi"\n{not json\n{"id": "a", "prompt": "Hello"}\n{"id": "b"}\n', encoding="utf-8")
+
+    async def collect():
+        return [item async for _, item in iter_items(str(input_path), completed=set())]
+
+    items = asyncio.run(collect())
+    assert [(item["id"], item["prompt"]) for item in items] == [("a", "Hello")]
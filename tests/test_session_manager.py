@@ -0,0 +1,49 @@
+import time
+
+from services.session_manager import SessionPool
+
+
+def test_touch_does_not_evict_busy_sessions_for_capacity():
+    pool = SessionPool(max_size=2, idle_ttl_seconds=0, memory_budget_bytes=0)
+    pool.touch("u", "busy")
+    pool.touch("u", "idle")
+
+    _, evicted = pool.touch("u", "new", busy=["busy"])
+
+    assert evicted == [("u", "idle")]
+    assert "busy" in pool
+
+
+def test_touch_stays_over_capacity_while_every_other_session_is_busy():
+    pool = SessionPool(max_size=1, idle_ttl_seconds=0, memory_budget_bytes=0)
+    pool.touch("u", "busy")
+
+    _, evicted = pool.touch("u", "new", busy=["busy"])
+
+    assert evicted == []
+    assert len(pool) == 2
+
+
+def test_idle_ttl_skips_busy_sessions():
+    pool = SessionPool(max_size=10, idle_ttl_seconds=0.01, memory_budget_bytes=0)
+    pool.touch("u", "busy")
+    pool.touch("u", "idle")
+    time.sleep(0.02)
+
+    _, evicted = pool.touch("u", "new", busy=["busy"])
+
+    assert evicted == [("u", "idle")]
+    assert "busy" in pool
+
+
+def test_budget_skips_busy_sessions():
+    pool = SessionPool(max_size=10, idle_ttl_seconds=0, memory_budget_bytes=100)
+    for session_id in ("busy", "cold", "hot"):
+        pool.touch("u", session_id)
+    for session_id in ("busy", "cold", "hot"):
+        pool.record_usage(session_id, 60, 1)
+
+    evicted = pool.sweep(busy=["busy"])
+
+    assert evicted == [("u", "cold")]
+    assert "busy" in pool and "hot" in pool
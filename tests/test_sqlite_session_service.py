@@ -0,0 +1,86 @@
+import asyncio
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from services.sqlite_session_service import SqliteSessionService
+
+APP = "app"
+
+
+def _event(text, state_delta=None):
+    return Event(author="user", invocation_id="inv", actions=EventActions(state_delta=state_delta or {}),
+                 content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+def _texts(session):
+    return [event.content.parts[0].text for event in session.events]
+
+
+async def _stored(db_path):
+    reader = SqliteSessionService(db_path=db_path)
+    try:
+        return await reader.get_session(app_name=APP, user_id="u", session_id="s")
+    finally:
+        reader.close()
+
+
+def test_stale_writer_cannot_overwrite_another_writers_changes(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        # A holds its writes for a second, so B commits in between
+        a = SqliteSessionService(db_path=db_path, flush_interval_seconds=1.0)
+        b = SqliteSessionService(db_path=db_path, flush_interval_seconds=0.01)
+        try:
+            await a.create_session(app_name=APP, user_id="u", session_id="s", state={"shared": 0})
+            await a.flush()
+            a_session = await a.get_session(app_name=APP, user_id="u", session_id="s")
+            b_session = await b.get_session(app_name=APP, user_id="u", session_id="s")
+
+            await a.append_event(a_session, _event("A prompt", {"shared": "a"}))  # Based on version 1
+            await b.append_event(b_session, _event("B prompt", {"b_only": 1}))
+            await b.flush()  # Disk is now at version 2
+            await a.append_event(a_session, _event("A reply", {"shared": "a2"}))  # Locally based on version 2
+            await a.flush()
+            assert a.stats()["write_conflicts"] == 2
+
+            # A reloads instead of serving its stale copy
+            reloaded = await a.get_session(app_name=APP, user_id="u", session_id="s")
+            assert _texts(reloaded) == ["B prompt"]
+        finally:
+            a.close()
+            b.close()
+        return await _stored(db_path)
+
+    stored = asyncio.run(scenario())
+    assert _texts(stored) == ["B prompt"]
+    assert stored.state == {"shared": 0, "b_only": 1}
+
+
+def test_writes_after_a_reload_apply_on_top_of_the_other_writer(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        a = SqliteSessionService(db_path=db_path, flush_interval_seconds=0.01)
+        b = SqliteSessionService(db_path=db_path, flush_interval_seconds=0.01)
+        try:
+            await a.create_session(app_name=APP, user_id="u", session_id="s", state={})
+            await a.flush()
+            b_session = await b.get_session(app_name=APP, user_id="u", session_id="s")
+            await b.append_event(b_session, _event("B prompt", {"b_only": 1}))
+            await b.flush()
+
+            a_session = await a.get_session(app_name=APP, user_id="u", session_id="s")
+            assert _texts(a_session) == ["B prompt"]
+            await a.append_event(a_session, _event("A prompt", {"a_only": 2}))
+            await a.flush()
+            assert a.stats()["write_conflicts"] == 0
+        finally:
+            a.close()
+            b.close()
+        return await _stored(db_path)
+
+    stored = asyncio.run(scenario())
+    assert _texts(stored) == ["B prompt", "A prompt"]
+    assert stored.state == {"b_only": 1, "a_only": 2}
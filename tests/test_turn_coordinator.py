@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from services.turn_coordinator import TurnCoordinator
+
+
+class Turns:
+    """Records turn execution; each turn blocks until released."""
+
+    def __init__(self):
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    def __call__(self, text, reply=None, error=None):
+        async def turn():
+            self.started.append(text)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                await self.release.wait()
+                if error is not None:
+                    raise error
+                return reply or f"reply to {text}"
+            finally:
+                self.running -= 1
+        return turn
+
+
+def test_identical_in_flight_prompts_share_one_turn():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        first = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi")))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coordinator.run("s", " Hi ", turns("Hi")))
+        await asyncio.sleep(0)
+        turns.release.set()
+        return turns, await asyncio.gather(first, second)
+
+    turns, replies = asyncio.run(scenario())
+    assert turns.started == ["Hi"]
+    assert replies == ["reply to Hi", "reply to Hi"]
+    assert coordinator.stats()["coalesced"] == 1
+    assert coordinator.busy_sessions() == []
+
+
+def test_prompt_repeated_after_its_turn_finished_runs_again():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        turns.release.set()
+        await coordinator.run("s", "Hi", turns("Hi"))
+        await coordinator.run("s", "Hi", turns("Hi"))
+        return turns
+
+    assert asyncio.run(scenario()).started == ["Hi", "Hi"]
+    assert coordinator.stats()["coalesced"] == 0
+
+
+def test_turns_on_one_session_run_one_at_a_time_in_order():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        tasks = []
+        for text in ("one", "two", "three"):
+            tasks.append(asyncio.create_task(coordinator.run("s", text, turns(text))))
+            await asyncio.sleep(0)
+        assert coordinator.busy_sessions() == ["s"]
+        assert coordinator.stats()["queued"] == 2
+        turns.release.set()
+        await asyncio.gather(*tasks)
+        return turns
+
+    turns = asyncio.run(scenario())
+    assert turns.started == ["one", "two", "three"]
+    assert turns.max_running == 1
+
+
+def test_turns_on_different_sessions_run_concurrently():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        tasks = [asyncio.create_task(coordinator.run(session_id, "Hi", turns("Hi"))) for session_id in ("a", "b")]
+        await asyncio.sleep(0.01)
+        turns.release.set()
+        await asyncio.gather(*tasks)
+        return turns
+
+    turns = asyncio.run(scenario())
+    assert turns.max_running == 2
+    assert coordinator.stats()["coalesced"] == 0
+
+
+def test_failed_turn_fails_its_duplicates_and_is_not_cached():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        first = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi", error=RuntimeError("boom"))))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi")))
+        await asyncio.sleep(0)
+        turns.release.set()
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        retried = await coordinator.run("s", "Hi", turns("Hi"))
+        return turns, results, retried
+
+    turns, results, retried = asyncio.run(scenario())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert retried == "reply to Hi"
+    assert turns.started == ["Hi", "Hi"]
+
+
+def test_cancelled_turn_cancels_its_duplicates_and_frees_the_session():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        first = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi")))
+        await asyncio.sleep(0)
+        duplicate = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi")))
+        queued = asyncio.create_task(coordinator.run("s", "Later", turns("Later")))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        with pytest.raises(asyncio.CancelledError):
+            await duplicate
+        turns.release.set()
+        return turns, await queued
+
+    turns, reply = asyncio.run(scenario())
+    assert reply == "reply to Later"
+    assert turns.started == ["Hi", "Later"]
+    assert coordinator.busy_sessions() == []
+
+
+def test_cancelling_a_duplicate_does_not_cancel_the_turn_it_shares():
+    coordinator = TurnCoordinator()
+
+    async def scenario():
+        turns = Turns()
+        first = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi")))
+        await asyncio.sleep(0)
+        duplicate = asyncio.create_task(coordinator.run("s", "Hi", turns("Hi")))
+        await asyncio.sleep(0)
+        duplicate.cancel()
+        turns.release.set()
+        return await first
+
+    assert asyncio.run(scenario()) == "reply to Hi"
+
+
+def test_stream_closed_early_fails_waiting_duplicates_instead_of_hanging():
+    coordinator = TurnCoordinator()
+
+    async def turn():
+        yield {"type": "partial", "text": "Hel"}
+        await asyncio.sleep(10)
+        yield {"type": "final", "text": "Hello"}
+
+    async def scenario():
+        stream = coordinator.stream("s", "Hi", turn)
+        assert (await stream.__anext__())["text"] == "Hel"
+        duplicate = asyncio.create_task(coordinator.run("s", "Hi", turn))
+        await asyncio.sleep(0)
+        await stream.aclose()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(duplicate, timeout=1)
+
+    asyncio.run(scenario())
+    assert coordinator.busy_sessions() == []
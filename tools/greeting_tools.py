@@ -1,6 +1,11 @@
 from typing import Dict, Any, Optional
 from google.adk.tools.tool_context import ToolContext
 
+from services.profile_store import get_profile_store
+from utils.log import get_logger
+
+log = get_logger(__name__)
+
 
 def fetch_greeting(tool_context: ToolContext, name: Optional[str] = None, hobbies: Optional[str] = None, interests: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -17,7 +22,9 @@ def fetch_greeting(tool_context: ToolContext, name: Optional[str] = None, hobbie
        Dict[str, Any]: A dictionary with 'status' ('success' or 'error') and either 'greeting' (personalized message)
         or 'message' (error description).
     """
-    print(f" -------Tool: fetch_greeting called with name={name}, hobbies={hobbies}, interests={interests} -------")
+    # Only which fields were passed is logged; their values are the user's personal details
+    log.debug("tool.fetch_greeting", updates=tuple(field for field, value in
+                                                  (("name", name), ("hobbies", hobbies), ("interests", interests)) if value))
 
     try:
         # Access the ADK session state directly through tool_context.state
@@ -26,22 +33,22 @@ def fetch_greeting(tool_context: ToolContext, name: Optional[str] = None, hobbie
         # Update user information if provided as parameters
         if name:
             adk_session_state['user_name'] = name
-            print(f" -------Tool: SESSION UPDATED - user_name set to: {name} -------")
         
         if hobbies:
             adk_session_state['user_hobbies'] = hobbies
-            print(f" -------Tool: SESSION UPDATED - user_hobbies set to: {hobbies} -------")
         
         if interests:
             adk_session_state['user_interests'] = interests
-            print(f" -------Tool: SESSION UPDATED - user_interests set to: {interests} -------")
+
+        # Write profile changes through to the user's profile, so their next session starts with them
+        if name or hobbies or interests:
+            get_profile_store().update(getattr(tool_context, "user_id", None),
+                                       {"user_name": name, "user_hobbies": hobbies, "user_interests": interests})
 
         # Fetch current user details from ADK session state
         user_name = adk_session_state.get('user_name', 'Friend')
         user_hobbies = adk_session_state.get('user_hobbies', '')
         user_interests = adk_session_state.get('user_interests', '')
-        
-        print(f" -------Tool: fetch_greeting - User details: name={user_name}, hobbies={user_hobbies}, interests={user_interests} -------")
 
         # Create the personalized greeting message
         greeting_parts = [f"Hello {user_name}!"]
@@ -58,14 +65,9 @@ def fetch_greeting(tool_context: ToolContext, name: Optional[str] = None, hobbie
         greeting_parts.append("How can I help you today?")
         
         personalized_greeting = " ".join(greeting_parts)
-        
-        print(f" -------Tool: fetch_greeting - Generated greeting: {personalized_greeting} -------")
 
         return {"status": "success", "greeting": personalized_greeting}
         
     except Exception as e:
-        print(f" -------Tool: ERROR in fetch_greeting: {e} -------")
+        log.exception("tool.fetch_greeting_failed", "fetch_greeting failed: %s", e)
         return {"status": "error", "message": f"Sorry, I encountered an error while processing your greeting: {str(e)}"}
-
-
-print("Greeting tools loaded successfully")
\ No newline at end of file
@@ -1,17 +1,30 @@
 import streamlit as st
-import logging
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
-from services.adk_service import initialize_adk, run_adk_sync
-from google.adk.runners import Runner
+from utils.log import get_logger, get_logging_stats
+from utils.startup import get_startup_profiler
 from config.settings import (
-    MESSAGE_HISTORY_KEY,
     APP_NAME_FOR_ADK,
-    USER_ID,
     MODEL_GEMINI,
+    MODEL_GEMINI_FAST,
+    ENABLE_STREAMING,
+    STREAMING_CURSOR,
+    CHAT_HISTORY_VISIBLE_KEY,
+    CHAT_HISTORY_WINDOW_SIZE,
+    CHAT_HISTORY_PAGE_SIZE,
     # get_api_key #uncomment if you want to check API key in the future
 )
 
+# The ADK service (and with it google.adk and google.genai) is imported on first
+# use inside the functions below, so the page header renders without waiting for it
+if TYPE_CHECKING:
+    from google.adk.runners import Runner
+
+log = get_logger(__name__)
+
+# st.fragment reruns only the decorated function; it was experimental before Streamlit 1.37
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
 
 def setup_page_config():
     """Configure Streamlit page settings"""
@@ -51,71 +64,178 @@ def render_header():
 #     return api_key
 
 
-def initialize_adk_service() -> Tuple[Runner, str]:
-    """Initialize ADK Runner and Session with error handling"""
+def initialize_adk_service() -> Tuple["Runner", str, str]:
+    """Initialize ADK Runner and this browser session's ADK Session with error handling"""
     try:
-        adk_runner, current_session_id = initialize_adk()
-        return adk_runner, current_session_id
+        from services.adk_service import initialize_adk
+        adk_runner, current_session_id, current_user_id = initialize_adk()
+        return adk_runner, current_session_id, current_user_id
     except Exception as e:
         st.error(f"**Fatal Error:** Could not initialize the ADK Runner or Session Service: {e}", icon="❌")
         st.error("Please check the terminal logs for more details, ensure your API key is valid, and restart the application.")
-        logging.exception("Critical ADK Initialization failed in Streamlit UI context.")
+        log.exception("ui.init_failed", "ADK initialization failed in the Streamlit UI")
         st.stop()  # Stop the app if ADK fails to initialize
 
 
 def initialize_message_history():
-    """Initialize message history in session state if not exists"""
-    if MESSAGE_HISTORY_KEY not in st.session_state:
-        st.session_state[MESSAGE_HISTORY_KEY] = []
-        print("Initialized Streamlit message history.")
+    """Initialize the chat history window size in session state if not set"""
+    if CHAT_HISTORY_VISIBLE_KEY not in st.session_state:
+        st.session_state[CHAT_HISTORY_VISIBLE_KEY] = CHAT_HISTORY_WINDOW_SIZE
+
+
+def _show_older_messages():
+    st.session_state[CHAT_HISTORY_VISIBLE_KEY] += CHAT_HISTORY_PAGE_SIZE
 
 
-def render_chat_interface(adk_runner: Runner, current_session_id: str):
+@_fragment
+def render_message_history(adk_runner: "Runner", current_session_id: str, current_user_id: str):
+    """
+    Render the most recent window of chat messages, with a pager for older ones.
+
+    Messages are read from the ADK session's events, the single copy of the
+    conversation, and only the visible window is materialized. Runs as a
+    Streamlit fragment, so "Load older messages" reruns only this function
+    instead of the whole app.
+    """
+    from services.adk_service import load_chat_history
+
+    hidden, dropped, messages = load_chat_history(adk_runner, current_session_id, current_user_id,
+                                                  st.session_state[CHAT_HISTORY_VISIBLE_KEY])
+    if dropped > 0 and hidden == 0:
+        st.caption(f"{dropped} earlier messages are no longer kept for this session.")
+    if hidden > 0:
+        st.button(f"Load older messages ({hidden} hidden)", key="load_older_messages", on_click=_show_older_messages)
+    for message in messages:
+        with st.chat_message(message.role):
+            st.markdown(message.content, unsafe_allow_html=False)
+
+
+def render_chat_interface(adk_runner: "Runner", current_session_id: str, current_user_id: str):
     """Render the main chat interface"""
+    from services.adk_service import run_adk_sync
+    from services.metrics import get_metrics
+
     st.subheader("Chat with the Assistant")
     st.markdown("Try saying **'hello'** or **'greet me'** after filling in your details above.")
 
     # Initialize message history
     initialize_message_history()
 
-    # Display existing chat messages
-    for message in st.session_state[MESSAGE_HISTORY_KEY]:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"], unsafe_allow_html=False)
+    # Display the recent window of chat messages
+    render_message_history(adk_runner, current_session_id, current_user_id)
 
     # Chat input field
     if prompt := st.chat_input("Ask for a greeting (e.g., 'greet me'), or just chat..."):
-        print(f"User input received: '{prompt[:50]}...'")
-        # Add user message to history and display
-        st.session_state[MESSAGE_HISTORY_KEY].append({"role": "user", "content": prompt})
+        log.debug("ui.prompt_received", session_id=current_session_id, prompt_chars=len(prompt))
+        # Display the user message; the turn itself records it in the ADK session
         with st.chat_message("user"):
             st.markdown(prompt, unsafe_allow_html=False)
 
         # Process prompt with ADK agent and display response
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
-            with st.spinner("Assistant is thinking..."):
-                try:
-                    agent_response = run_adk_sync(adk_runner, current_session_id, prompt)
+            try:
+                if ENABLE_STREAMING:
+                    agent_response = render_streaming_response(message_placeholder, adk_runner, current_session_id, current_user_id, prompt)
+                else:
+                    with st.spinner("Assistant is thinking..."):
+                        agent_response = run_adk_sync(adk_runner, current_session_id, prompt, current_user_id)
+                with get_metrics().span("adk_render_seconds"):
                     message_placeholder.markdown(agent_response, unsafe_allow_html=False)
-                except Exception as e:
-                    error_msg = f"Sorry, an error occurred while processing your request: {e}"
-                    st.error(error_msg)
-                    agent_response = f"Error: Failed to get response. {e}"
-                    logging.exception("Error occurred within the Streamlit chat input processing block.")
-        
-        # Add agent response to history
-        st.session_state[MESSAGE_HISTORY_KEY].append({"role": "assistant", "content": agent_response})
-        print("Agent response added to history. Streamlit will rerun.")
-
-
-def render_debug_info(current_session_id: str):
+            except Exception as e:
+                error_msg = f"Sorry, an error occurred while processing your request: {e}"
+                st.error(error_msg)
+                log.exception("ui.turn_failed", "Chat turn failed in the Streamlit UI", session_id=current_session_id)
+
+
+def render_streaming_response(message_placeholder, adk_runner: "Runner", current_session_id: str, current_user_id: str, prompt: str) -> str:
+    """
+    Stream the agent's response into the placeholder as chunks arrive.
+
+    Returns:
+        The final response text for the turn.
+    """
+    from services.adk_service import stream_adk_sync
+
+    message_placeholder.markdown("_Assistant is thinking..._")
+    streamed_text = ""
+    agent_response = ""
+    for chunk in stream_adk_sync(adk_runner, current_session_id, prompt, current_user_id):
+        if chunk["type"] == "text":
+            streamed_text += chunk["text"]
+            message_placeholder.markdown(streamed_text + STREAMING_CURSOR, unsafe_allow_html=False)
+        elif chunk["type"] == "tool_call" and not streamed_text:
+            message_placeholder.markdown(f"_Calling `{chunk['name']}`..._")
+        elif chunk["type"] == "tool_result" and not streamed_text:
+            message_placeholder.markdown(f"_`{chunk['name']}` finished, composing reply..._")
+        elif chunk["type"] == "final":
+            agent_response = chunk["text"]
+    return agent_response
+
+
+def render_debug_info(current_session_id: str, current_user_id: str):
     """Render debugging information in an expandable section"""
+    from services.adk_service import (
+        get_session_pool_stats,
+        get_session_memory_stats,
+        get_intent_router_stats,
+        get_turn_queue_stats,
+        get_admission_stats,
+        get_model_tier_stats,
+        get_profile_store_stats,
+        get_latency_summary,
+    )
+
     with st.expander("ADK Internal Details (for debugging)"):
         st.caption(f"**App Name:** `{APP_NAME_FOR_ADK}`")
-        st.caption(f"**User ID:** `{USER_ID}`")
+        st.caption(f"**User ID:** `{current_user_id}`")
         st.caption(f"**Session ID:** `{current_session_id}`")
-        st.caption(f"**LLM Model:** `{MODEL_GEMINI}`")
+        st.caption(f"**LLM Model:** `{MODEL_GEMINI}`" + (f" (fast tier: `{MODEL_GEMINI_FAST}`)" if MODEL_GEMINI_FAST else ""))
+        pool_stats = get_session_pool_stats()
+        st.caption(
+            f"**Session Pool:** `{pool_stats['occupancy']}/{pool_stats['capacity']}` active, "
+            f"hit rate `{pool_stats['hit_rate']:.0%}`, "
+            f"evictions `{pool_stats['lru_evictions']}` LRU / `{pool_stats['ttl_evictions']}` idle / "
+            f"`{pool_stats['budget_evictions']}` over budget"
+        )
+        memory_stats = get_session_memory_stats()
+        st.caption(
+            f"**Session Memory:** ~`{memory_stats['bytes'] / 2**20:.1f}` of `{memory_stats['budget_bytes'] / 2**20:.0f}` MiB "
+            f"in `{memory_stats['events']}` events, `{memory_stats['events_trimmed']}` old events dropped, "
+            f"`{memory_stats['sweeps']}` sweeps (last `{memory_stats['last_sweep_ms']:.1f}` ms)"
+        )
+        router_stats = get_intent_router_stats()
+        st.caption(
+            f"**Fast Path:** `{router_stats['routed']}/{router_stats['total']}` turns answered without the LLM "
+            f"(hit rate `{router_stats['hit_rate']:.0%}`)"
+        )
+        queue_stats = get_turn_queue_stats()
+        st.caption(
+            f"**Turn Queue:** `{queue_stats['running']}` running / `{queue_stats['queued']}` queued "
+            f"(max depth `{queue_stats['max_queue_depth']}`), "
+            f"`{queue_stats['coalesced']}` duplicate prompts coalesced"
+        )
+        admission_stats = get_admission_stats()
+        st.caption(
+            f"**Model Admission:** `{admission_stats['in_flight']}` in flight / `{admission_stats['waiting']}` waiting, "
+            f"`{admission_stats['rejected']}` rejected, `{admission_stats['retries']}` retries"
+        )
+        tier_stats = get_model_tier_stats()
+        st.caption(
+            f"**Model Tiers:** `{tier_stats['tier_turns'].get('fast', 0)}` fast / `{tier_stats['tier_turns'].get('full', 0)}` full turns, "
+            f"escalation rate `{tier_stats['escalation_rate']:.0%}`"
+        )
+        profile_stats = get_profile_store_stats()
+        st.caption(
+            f"**Profile Store:** `{profile_stats['cached']}` cached profiles, "
+            f"hit rate `{profile_stats['hit_rate']:.0%}`, `{profile_stats['writes']}` writes"
+        )
+        logging_stats = get_logging_stats()
+        st.caption(f"**Logging:** `{logging_stats['queued']}` records queued, `{logging_stats['dropped']}` dropped")
+        latency_rows = get_latency_summary()
+        if latency_rows:
+            st.caption("**Turn latency breakdown** (recent samples, ms)")
+            st.table(latency_rows)
         st.caption("Powered by Google Agent Development Kit.")
 
 
@@ -126,22 +246,23 @@ def run_streamlit_app():
     
     # Render header
     render_header()
+    profiler = get_startup_profiler()
+    profiler.mark("first page render")
     
     # Check API key
     # check_api_key()
     
     # Initialize ADK service
-    adk_runner, current_session_id = initialize_adk_service()
+    adk_runner, current_session_id, current_user_id = initialize_adk_service()
+    profiler.ready()
     
     st.divider()
     
     # Render chat interface
-    render_chat_interface(adk_runner, current_session_id)
+    render_chat_interface(adk_runner, current_session_id, current_user_id)
     
     # Render debug information
-    render_debug_info(current_session_id)
-    
-    print("✅ Streamlit UI Rendering Complete.")
+    render_debug_info(current_session_id, current_user_id)
 
 
 if __name__ == "__main__":
@@ -2,16 +2,49 @@
 Utility helper functions for the ADK Greeting Chat Application
 """
 
+import hashlib
 import os
+import re
+import secrets
 import time
 from typing import Dict, Any, Optional
 
+from utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Browser user tokens are secrets.token_urlsafe(24): 32 URL-safe characters
+_USER_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]{32}")
+
 
 def generate_session_id() -> str:
     """Generate a unique session ID for ADK sessions"""
     return f"streamlit_adk_session_{int(time.time())}_{os.urandom(4).hex()}"
 
 
+def generate_user_id() -> str:
+    """Generate a unique ADK user ID for a browser session"""
+    return f"streamlit_user_{os.urandom(6).hex()}"
+
+
+def generate_user_token() -> str:
+    """Generate an unguessable token identifying a browser user (kept in the page URL)"""
+    return secrets.token_urlsafe(24)
+
+
+def user_id_from_token(token: str) -> Optional[str]:
+    """
+    Derive the ADK user ID of a browser user token, or None if the token is malformed.
+
+    The ID is a hash of the token, so a URL can only name a user by holding
+    their token: no other ID (including the default USER_ID) can be chosen,
+    and IDs shown in logs or the debug panel do not reveal the token.
+    """
+    if not token or not _USER_TOKEN_RE.fullmatch(token):
+        return None
+    return f"streamlit_user_{hashlib.sha256(token.encode('ascii')).hexdigest()[:24]}"
+
+
 def validate_user_input(user_input: str) -> bool:
     """Validate user input for basic requirements"""
     if not user_input or not user_input.strip():
@@ -37,11 +70,7 @@ def truncate_text(text: str, max_length: int = 150) -> str:
 
 def log_user_interaction(action: str, details: Optional[Dict[str, Any]] = None):
     """Log user interactions for debugging purposes"""
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[{timestamp}] User Action: {action}"
-    if details:
-        log_message += f" - Details: {details}"
-    print(log_message)
+    log.debug("user.action", action=action, details=details)
 
 
 def safe_get_env_var(var_name: str, default_value: str = "") -> str:
@@ -56,6 +85,3 @@ def format_greeting_response(status: str, content: str) -> Dict[str, str]:
         "content": content,
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
     }
-
-
-print("Helper utilities loaded successfully")
\ No newline at end of file
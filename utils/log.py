@@ -0,0 +1,206 @@
+"""
+Structured, non-blocking logging.
+
+Every module logs through get_logger(__name__). A call names an event and may
+carry a %-style message and key/value fields:
+
+    log.info("turn.completed", "Turn completed in %.2fs", duration, session_id=session_id)
+
+- Calls below the configured level, or dropped by sampling, return before
+  anything is formatted, so disabled logging costs a level check.
+- Records are built directly rather than through Logger.log, which skips the
+  stack walk for the caller's file and line (neither formatter writes them)
+  without changing how other libraries' records are made.
+- Records are handed to a bounded queue; a background writer thread encodes
+  them as JSON lines and does the I/O. If the writer falls behind, records are
+  dropped (and counted) rather than blocking the caller.
+- Fields are encoded on the writer thread, so pass values that will not change
+  afterwards (strings, numbers, tuples), not live objects such as session state.
+  Fields named like LogRecord attributes (name, module, args, ...) are written
+  with a "field_" prefix.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from config.settings import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_QUEUE_MAX_SIZE,
+    LOG_SAMPLE_RATES,
+    LOG_THIRD_PARTY_LEVEL,
+)
+
+# Attributes of every LogRecord; anything else on a record is a structured field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+_APP_LOGGER = "adk_app"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line: time, level, logger, event, message and fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None) or "log",
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key != "event":
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable single-line format for local development (ADK_LOG_FORMAT=text)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in record.__dict__.items()
+                          if key not in _RECORD_ATTRS and key != "event")
+        event = getattr(record, "event", None) or record.name
+        message = record.getMessage()
+        line = f"{record.levelname:<7} {event}" + (f": {message}" if message != event else "")
+        if fields:
+            line += f" [{fields}]"
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks: a full queue drops the record.
+
+    Only the %-message is rendered on the calling thread (its arguments may be
+    mutated later); tracebacks are rendered too, as they hold live frames. It is
+    the only handler on the root logger, so the record is prepared in place
+    rather than copied.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger:
+    """Thin wrapper over a stdlib logger: event names, structured fields, sampling."""
+
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+
+    def is_enabled(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level: int, event: str, msg: str, args: tuple, fields: Mapping[str, Any], exc_info: Any = None) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        rate = LOG_SAMPLE_RATES.get(event)
+        if rate is not None and random.random() >= rate:
+            return
+        if _RECORD_ATTRS.isdisjoint(fields):
+            extra = dict(fields)
+        else:
+            extra = {f"field_{key}" if key in _RECORD_ATTRS else key: value for key, value in fields.items()}
+        extra["event"] = event
+        if exc_info is True:
+            exc_info = sys.exc_info()
+        logger = self._logger
+        logger.handle(logger.makeRecord(logger.name, level, "", 0, msg or event, args, exc_info, extra=extra))
+
+    def debug(self, event: str, msg: str = "", *args: Any, **fields: Any) -> None:
+        self._log(logging.DEBUG, event, msg, args, fields)
+
+    def info(self, event: str, msg: str = "", *args: Any, **fields: Any) -> None:
+        self._log(logging.INFO, event, msg, args, fields)
+
+    def warning(self, event: str, msg: str = "", *args: Any, **fields: Any) -> None:
+        self._log(logging.WARNING, event, msg, args, fields)
+
+    def error(self, event: str, msg: str = "", *args: Any, **fields: Any) -> None:
+        self._log(logging.ERROR, event, msg, args, fields)
+
+    def exception(self, event: str, msg: str = "", *args: Any, **fields: Any) -> None:
+        """Log at ERROR level with the traceback of the exception being handled."""
+        self._log(logging.ERROR, event, msg, args, fields, exc_info=True)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """
+    Route all logging (ours and third-party) through the queue and start the
+    writer thread. Safe to call more than once; get_logger calls it.
+    """
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is not None:
+            return
+        log_queue: "queue.Queue" = queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE)
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(LOG_THIRD_PARTY_LEVEL)  # Libraries (google.adk, httpx, ...) stay quiet
+        logging.getLogger(_APP_LOGGER).setLevel(LOG_LEVEL)
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Stop the writer thread after it has written every queued record."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Return the structured logger for a module (pass __name__)."""
+    configure_logging()
+    return StructuredLogger(logging.getLogger(f"{_APP_LOGGER}.{name}"))
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Records waiting for the writer and records dropped because the queue was full."""
+    handler = _queue_handler
+    if handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": handler.queue.qsize(), "dropped": handler.dropped}
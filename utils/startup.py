@@ -0,0 +1,136 @@
+"""
+Startup profiling: per-module import times and time-to-ready.
+
+Enable with ADK_PROFILE_STARTUP=true. The profiler must be installed before
+the heavy imports it should measure, which is why entry points call
+get_startup_profiler() before importing the rest of the application.
+"""
+
+import builtins
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.log import get_logger
+from config.settings import STARTUP_PROFILE, STARTUP_PROFILE_TOP_MODULES
+
+log = get_logger(__name__)
+
+
+def _process_age_seconds() -> Optional[float]:
+    """Seconds since this process was started (Linux only), or None if unknown."""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; fields after it are space separated
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # Field 22 (starttime), counted from field 3
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+
+class StartupProfiler:
+    """
+    Records how long each module takes to import and when startup milestones
+    (first render, runner built, ready) are reached.
+
+    Import times are cumulative, including the modules a module imports itself,
+    like `python -X importtime`. Only the first import of a module is timed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.process_age_at_start = _process_age_seconds()
+        self.import_seconds: Dict[str, float] = {}
+        self.milestones: List[Tuple[str, float]] = []
+        self.reported = False
+        self._original_import = None
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        """Start timing imports made from now on."""
+        if self._original_import is not None:
+            return
+        original_import = self._original_import = builtins.__import__
+        import_seconds = self.import_seconds
+        modules = sys.modules
+
+        def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in modules:
+                return original_import(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                import_seconds.setdefault(name, time.perf_counter() - start)
+
+        builtins.__import__ = _timed_import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, milestone: str) -> None:
+        """Record that a startup milestone was reached (only its first occurrence counts)."""
+        with self._lock:
+            if all(name != milestone for name, _ in self.milestones):
+                self.milestones.append((milestone, time.perf_counter() - self.started))
+
+    def ready(self) -> None:
+        """Mark the app ready to serve, stop timing imports and log the report once."""
+        self.mark("ready")
+        with self._lock:
+            if self.reported:
+                return
+            self.reported = True
+        self.uninstall()
+        slowest = sorted(self.import_seconds.items(), key=lambda item: item[1], reverse=True)[:STARTUP_PROFILE_TOP_MODULES]
+        log.info("startup.ready", self.report(),
+                 process_age_ms=round(self.process_age_at_start * 1000, 1) if self.process_age_at_start is not None else None,
+                 milestones_ms={name: round(seconds * 1000, 1) for name, seconds in self.milestones},
+                 slowest_imports_ms={name: round(seconds * 1000, 1) for name, seconds in slowest})
+
+    def report(self, top: int = STARTUP_PROFILE_TOP_MODULES) -> str:
+        lines = ["--- Startup Profile ---"]
+        if self.process_age_at_start is not None:
+            lines.append(f"  interpreter start -> profiler installed: {self.process_age_at_start * 1000:8.1f} ms")
+        for name, seconds in self.milestones:
+            lines.append(f"  time to {name:<28} {seconds * 1000:8.1f} ms")
+        slowest = sorted(self.import_seconds.items(), key=lambda item: item[1], reverse=True)[:top]
+        if slowest:
+            lines.append(f"  slowest imports (cumulative, top {len(slowest)} of {len(self.import_seconds)}):")
+            lines.extend(f"    {seconds * 1000:8.1f} ms  {name}" for name, seconds in slowest)
+        lines.append("--- End Startup Profile ---")
+        return "\n".join(lines)
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off, so call sites need no checks."""
+
+    def mark(self, milestone: str) -> None:
+        pass
+
+    def ready(self) -> None:
+        pass
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_startup_profiler():
+    """Return the process-wide startup profiler, installing it on first call if ADK_PROFILE_STARTUP is set."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            if STARTUP_PROFILE:
+                _profiler = StartupProfiler()
+                _profiler.install()
+            else:
+                _profiler = _NullProfiler()
+    return _profiler